@@ -119,6 +119,9 @@ router.get('/:languageId/:textId/chunks', authMiddleware, async (req, res) => {
       languageId,
       title: text.title,
       chunks: [chunk],
+      // Contents of the following chunks, passed to the Python service as a prefetch
+      // hint; the third one is only used as context for the second
+      upcoming: text.chunks.slice(pageNum + 1, pageNum + 4).map(c => c.content),
       totalChunks: text.totalChunks,
       currentPage: pageNum,
       hasMore: pageNum + 1 < text.totalChunks
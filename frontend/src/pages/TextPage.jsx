@@ -19,6 +19,8 @@ const TextPage = () => {
   const [chunks, setChunks] = useState([]);
   const [visibleChunks, setVisibleChunks] = useState([]);
   const [currentPage, setCurrentPage] = useState(0);
+  // Texts of the chunks after the last fetched one, for prefetch and context
+  const [upcomingChunks, setUpcomingChunks] = useState([]);
   const [hasMore, setHasMore] = useState(true);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
@@ -49,19 +51,26 @@ const TextPage = () => {
   };
 
 
-  const analyzeChunk = async (chunk, prevChunksLength = 0) => {
+  const analyzeChunk = async (chunk, prevChunksLength = 0, upcoming = [], contextBefore = '') => {
     const selectedFeaturesList = Object.entries(selectedFeatures)
       .filter(([_, isSelected]) => isSelected)
       .map(([featureId]) => featureId);
 
+    const userId = localStorage.getItem('userId');
     const response = await fetch(`${PYTHON_API_URL}/analyze/${languageId}`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
+        // Analysis is queued fairly per user
+        ...(userId && { 'X-User-Id': userId }),
       },
       body: JSON.stringify({
         text: chunk.content,
-        features: selectedFeaturesList
+        features: selectedFeaturesList,
+        prefetch: upcoming,
+        // Neighbouring chunks let the service see sentences cut at chunk boundaries
+        context_before: contextBefore,
+        context_after: upcoming[0] || ''
       })
     });
 
@@ -108,7 +117,13 @@ const TextPage = () => {
         try {
           // Calculate the total length of previous chunks for offset
           const prevChunksLength = chunks.reduce((acc, chunk) => acc + chunk.content.length, 0);
-          const analyzedWords = await analyzeChunk(nextChunk, prevChunksLength);
+          const prevChunk = page > 0 ? chunks[chunks.length - 1] : null;
+          const analyzedWords = await analyzeChunk(
+            nextChunk,
+            prevChunksLength,
+            data.upcoming || [],
+            prevChunk ? prevChunk.content : ''
+          );
 
           if (page === 0) {
             setChunks([nextChunk]);
@@ -140,6 +155,7 @@ const TextPage = () => {
 
       setHasMore(data.hasMore);
       setCurrentPage(data.currentPage);
+      setUpcomingChunks(data.upcoming || []);
     } catch (err) {
       console.error('Error:', err);
       setError('Failed to load text');
@@ -169,7 +185,9 @@ const TextPage = () => {
 
     try {
       setPracticeLoading(true);
-      const analyzedWords = await analyzeChunk(chunks[0], 0);
+      // Chunks after the first: those already loaded, then the ones not fetched yet
+      const upcoming = [...chunks.slice(1).map(chunk => chunk.content), ...upcomingChunks].slice(0, 3);
+      const analyzedWords = await analyzeChunk(chunks[0], 0, upcoming);
       setPracticeMode(true);
       setPracticeWords(analyzedWords);
       setVisibleChunks([chunks[0]]);
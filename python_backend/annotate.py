@@ -0,0 +1,240 @@
+"""Bulk-annotate a corpus offline so the service starts with a warm sentence memo.
+
+Reads a JSONL file ({"id", "language", "text"} per line) or a directory of
+.txt files, tags every distinct sentence for all features with a process
+pool per language, and writes <output>/<language>.annotations.jsonl. Start
+the service with ANNOTATIONS_DIR=<output> to load the results; any feature
+selection is served from them. Only records made with the model version
+the service runs are loaded, so re-annotate after changing models.
+Interrupted runs resume where they stopped: completed text ids are listed
+in <output>/<language>.done.
+
+Run from python_backend/:
+
+    python annotate.py corpus.jsonl annotations/
+    python annotate.py texts/spanish annotations/ --language spanish --workers 4
+"""
+import argparse
+import importlib
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from sentence_memo import BATCH_MAX_CHARS, BATCH_SEPARATOR, sentence_cores, sentence_key, tag_batch
+
+logger = logging.getLogger(__name__)
+
+PROCESSORS = {
+    'russian': 'language_processors.russian.RussianProcessor',
+    'spanish': 'language_processors.spanish.SpanishProcessor',
+    'french': 'language_processors.french.FrenchProcessor',
+    'hebrew': 'language_processors.hebrew.HebrewProcessor',
+    'arabic': 'language_processors.arabic.ArabicProcessor',
+}
+
+# Per-process state, set up once by _init_worker
+_processor = None
+_language = None
+_seen: Set[str] = set()
+
+
+def _make_processor(language: str, stub: bool):
+    if stub:
+        from language_processors.stub import stub_processors
+        return stub_processors()[language]()
+    module_name, class_name = PROCESSORS[language].rsplit('.', 1)
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+def _init_worker(language: str, stub: bool):
+    global _processor, _language
+    logging.basicConfig(level=logging.WARNING)
+    _language = language
+    _processor = _make_processor(language, stub)
+
+
+def _annotate_batch(texts: List[Tuple[str, str]]) -> Tuple[List[str], List[Dict[str, Any]], int, str]:
+    """Tag the distinct, not yet seen sentences of a batch of texts."""
+    version = _processor.model_version
+    pending: Dict[str, str] = {}
+    for _, text in texts:
+        for _, core in sentence_cores(text):
+            key = sentence_key(_language, version, core)
+            if key not in _seen and key not in pending:
+                pending[key] = core
+
+    records = []
+    chars = 0
+    keys = list(pending)
+    start = 0
+    while start < len(keys):
+        size = 0
+        end = start
+        while end < len(keys) and (end == start or size < BATCH_MAX_CHARS):
+            size += len(pending[keys[end]]) + len(BATCH_SEPARATOR)
+            end += 1
+        batch = keys[start:end]
+        sentences = [pending[key] for key in batch]
+        chars += sum(len(sentence) for sentence in sentences)
+        for key, candidates in zip(batch, tag_batch(_processor.tag_text, sentences)):
+            records.append({'k': key, 'c': candidates})
+            _seen.add(key)
+        start = end
+    return [text_id for text_id, _ in texts], records, chars, version
+
+
+def read_corpus(path: str, language: Optional[str]) -> Iterator[Tuple[str, str, str]]:
+    """Yield (language, id, text) from a JSONL file or a directory of .txt files."""
+    if os.path.isdir(path):
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                if not name.endswith('.txt'):
+                    continue
+                full = os.path.join(root, name)
+                text_id = os.path.relpath(full, path)
+                text_language = language or text_id.split(os.sep)[0]
+                with open(full, encoding='utf-8') as f:
+                    yield text_language, text_id, f.read()
+        return
+
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            yield (record.get('language', language), str(record.get('id', line_number)),
+                   record['text'])
+
+
+def _drop_partial_line(path: str):
+    """Cut a last line left unterminated by an interrupted run, so appends start on a new line."""
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(position - 65536, 0)
+            f.seek(start)
+            block = f.read(position - start)
+            if position == end and block.endswith(b'\n'):
+                return
+            newline = block.rfind(b'\n')
+            if newline >= 0:
+                position = start + newline + 1
+                break
+            position = start
+        logger.warning(f"Dropping {end - position} bytes of an incomplete last line in {path}")
+        f.truncate(position)
+
+
+def _read_done(path: str) -> Set[str]:
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding='utf-8') as f:
+        return {line.rstrip('\n') for line in f if line.strip()}
+
+
+def _read_keys(path: str) -> Set[str]:
+    if not os.path.exists(path):
+        return set()
+    keys = set()
+    corrupt = 0
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                keys.add(json.loads(line)['k'])
+            except (ValueError, TypeError, KeyError):
+                corrupt += 1
+    if corrupt:
+        logger.warning(f"Skipped {corrupt} undecodable lines in {path}")
+    return keys
+
+
+def annotate_language(language: str, texts: List[Tuple[str, str]], output: str, workers: int,
+                      batch_size: int, stub: bool, report_every: float = 5) -> Dict[str, Any]:
+    """Annotate one language's texts with a process pool and append results to its output file."""
+    annotations_path = os.path.join(output, f'{language}.annotations.jsonl')
+    done_path = os.path.join(output, f'{language}.done')
+    # A killed run can leave half a line; a cut-off text id must not count as done
+    _drop_partial_line(annotations_path)
+    _drop_partial_line(done_path)
+    done = _read_done(done_path)
+    todo = [(text_id, text) for text_id, text in texts if text_id not in done]
+    logger.info(f"{language}: {len(todo)} texts to annotate ({len(texts) - len(todo)} already done)")
+    if not todo:
+        return {'texts': 0, 'sentences': 0, 'chars': 0, 'seconds': 0.0}
+
+    # Workers only know the sentences they analyzed themselves
+    written = _read_keys(annotations_path)
+    batches = [todo[i:i + batch_size] for i in range(0, len(todo), batch_size)]
+    started = last_report = time.monotonic()
+    totals = {'texts': 0, 'sentences': 0, 'chars': 0}
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(language, stub)) as pool, \
+            open(annotations_path, 'a', encoding='utf-8') as annotations, \
+            open(done_path, 'a', encoding='utf-8') as done_file:
+        for text_ids, records, chars, _ in pool.map(_annotate_batch, batches):
+            records = [record for record in records if record['k'] not in written]
+            for record in records:
+                written.add(record['k'])
+                annotations.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+            annotations.flush()
+            # Only mark texts done once their sentences are on disk
+            done_file.write(''.join(f'{text_id}\n' for text_id in text_ids))
+            done_file.flush()
+
+            totals['texts'] += len(text_ids)
+            totals['sentences'] += len(records)
+            totals['chars'] += chars
+            now = time.monotonic()
+            if now - last_report >= report_every or totals['texts'] == len(todo):
+                elapsed = now - started
+                rate = totals['texts'] / elapsed
+                eta = (len(todo) - totals['texts']) / rate if rate else 0
+                print(f"{language}: {totals['texts']}/{len(todo)} texts, "
+                      f"{totals['sentences']} new sentences, {rate:.1f} texts/s, "
+                      f"{totals['chars'] / elapsed:,.0f} chars/s, ETA {eta:.0f}s", flush=True)
+                last_report = now
+
+    totals['seconds'] = round(time.monotonic() - started, 1)
+    return totals
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('input', help='JSONL file or directory of .txt files')
+    parser.add_argument('output', help='directory for annotation files')
+    parser.add_argument('--language', help='language of texts that do not specify one')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='processes per language')
+    parser.add_argument('--batch-size', type=int, default=16, help='texts per task')
+    parser.add_argument('--stub', action='store_true', help='use stub processors (for testing)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    os.makedirs(args.output, exist_ok=True)
+
+    by_language: Dict[str, List[Tuple[str, str]]] = {}
+    for language, text_id, text in read_corpus(args.input, args.language):
+        if language not in PROCESSORS:
+            logger.warning(f"Skipping {text_id}: unsupported language {language!r}")
+            continue
+        by_language.setdefault(language, []).append((text_id, text))
+
+    for language, texts in by_language.items():
+        totals = annotate_language(language, texts, args.output, args.workers,
+                                   args.batch_size, args.stub)
+        logger.info(f"{language}: done {totals}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,12 +1,25 @@
-from flask import Flask, request, jsonify
+from flask import Flask, g, request, jsonify
 from flask_cors import CORS
+from functools import partial
+from itertools import takewhile
+import hmac
+import inspect
 import logging
 import os 
-from language_processors.russian import RussianProcessor
-from language_processors.spanish import SpanishProcessor
-from language_processors.french import FrenchProcessor
-from language_processors.hebrew import HebrewProcessor
-from language_processors.arabic import ArabicProcessor
+import threading
+import time
+from language_processors import grading
+from language_processors.features import available_features
+from language_processors.normalization import cache_key
+from language_processors.warmup import WARMUP_TEXTS
+from analysis_cache import AnalysisCache
+from model_manager import ModelManager
+from prefetch import Prefetcher
+from lanes import LaneFull, LaneScheduler
+from traffic import TrafficRecorder
+from sentence_memo import analyze_by_sentence, load_annotations
+from segmentation import (analyze_with_context, chunk_boundaries, context_key_text,
+                          split_sentences, stitch_context)
 
 # Import other language processors as they're implemented
 
@@ -19,27 +32,163 @@ CORS(app, resources={
     r"/*": {
         "origins": ["http://localhost:5173"],
         "methods": ["GET", "POST", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization"]
+        "allow_headers": ["Content-Type", "Authorization", "X-User-Id"]
     }
 })
 
-# Initialize language processors
-language_processors = {
-    'russian': RussianProcessor(),
-    'spanish': SpanishProcessor(),
-    'french': FrenchProcessor(),
-    'hebrew': HebrewProcessor(),
-    'arabic': ArabicProcessor(),
-}
+# Language processor factories; models are loaded and unloaded by the model manager
+if os.environ.get('STUB_MODELS'):
+    # Model-free processors for load testing (see perf/loadtest.py)
+    from language_processors.stub import stub_processors
+    language_processors = stub_processors()
+else:
+    from language_processors.russian import RussianProcessor
+    from language_processors.spanish import SpanishProcessor
+    from language_processors.french import FrenchProcessor
+    from language_processors.hebrew import HebrewProcessor
+    from language_processors.arabic import ArabicProcessor
+
+    language_processors = {
+        'russian': RussianProcessor,
+        'spanish': SpanishProcessor,
+        'french': FrenchProcessor,
+        'hebrew': HebrewProcessor,
+        'arabic': ArabicProcessor,
+    }
+
+model_manager = ModelManager(
+    language_processors,
+    memory_budget_mb=float(os.environ.get('MODEL_MEMORY_BUDGET_MB', 0)),
+    idle_ttl=float(os.environ.get('MODEL_IDLE_TTL_SECONDS', 0)),
+    sweep_interval=float(os.environ.get('MODEL_SWEEP_INTERVAL_SECONDS', 60)),
+)
+_preload = os.environ.get('MODEL_PRELOAD', 'all')
+if _preload:
+    model_manager.preload(None if _preload == 'all' else _preload.split(','))
+model_manager.start_sweeper()
+
+# Cache of analysis results, shared across users
+analysis_cache = AnalysisCache(max_entries=int(os.environ.get('ANALYSIS_CACHE_SIZE', 1024)))
+
+# Longest sentence fragment taken from a neighbouring chunk as context
+CONTEXT_MAX_CHARS = int(os.environ.get('CONTEXT_MAX_CHARS', 300))
+
+# Per-sentence tags shared across texts, users and feature selections (0 disables)
+sentence_memo = AnalysisCache(max_entries=int(os.environ.get('SENTENCE_MEMO_SIZE', 50000)))
+# Pre-computed by annotate.py; loaded for each model version when it first serves
+ANNOTATIONS_DIR = os.environ.get('ANNOTATIONS_DIR', '')
+_annotations_loaded = set()
+_annotations_lock = threading.Lock()
+
+def _load_annotations(language, version):
+    if not ANNOTATIONS_DIR or not sentence_memo.max_entries or (language, version) in _annotations_loaded:
+        return
+    with _annotations_lock:
+        if (language, version) not in _annotations_loaded:
+            try:
+                load_annotations(ANNOTATIONS_DIR, sentence_memo, language, version)
+            except Exception as e:
+                # Annotations only warm the memo; serve without them rather than fail /analyze
+                logger.error(f"Error loading {language} annotations: {e}")
+            _annotations_loaded.add((language, version))
+
+for _language in model_manager.languages():
+    if model_manager.is_resident(_language):
+        _load_annotations(_language, model_manager.version(_language))
+
+def _analyzer(language, processor):
+    """Return processor.analyze_text, going through the sentence memo when enabled."""
+    if not sentence_memo.max_entries:
+        return processor.analyze_text
+    _load_annotations(language, processor.model_version)
+    return partial(analyze_by_sentence, processor.tag_text, sentence_memo,
+                   language, processor.model_version)
+
+def _prefetch_analyze(language, text, features, context_before, context_after):
+    """Analyze an upcoming chunk in the background; never reloads an evicted model."""
+    if not model_manager.is_resident(language):
+        return None
+    with model_manager.processor(language) as processor:
+        return analyze_with_context(_analyzer(language, processor), text, features,
+                                    context_before, context_after)
+
+prefetcher = Prefetcher(
+    _prefetch_analyze,
+    analysis_cache,
+    depth=int(os.environ.get('PREFETCH_DEPTH', 2)),
+    max_queue=int(os.environ.get('PREFETCH_QUEUE_SIZE', 64)),
+    max_foreground=int(os.environ.get('PREFETCH_MAX_FOREGROUND', 0)),
+    max_age=float(os.environ.get('PREFETCH_MAX_AGE_SECONDS', 30)),
+)
+PREFETCH_JOIN_TIMEOUT = float(os.environ.get('PREFETCH_JOIN_TIMEOUT_SECONDS', 10))
+
+# Model-bound analysis runs on bounded per-language pools with fair queuing between
+# users; /check and /features stay on the request thread so they never queue behind it.
+analysis_lanes = LaneScheduler(
+    workers=int(os.environ.get('ANALYZE_WORKERS_PER_LANGUAGE', 2)),
+    max_queue=int(os.environ.get('ANALYZE_QUEUE_SIZE', 64)),
+    max_concurrent=int(os.environ.get('ANALYZE_MAX_CONCURRENT', os.cpu_count() or 1)),
+)
+ANALYZE_TIMEOUT = float(os.environ.get('ANALYZE_TIMEOUT_SECONDS', 60))
+
+def _client_id():
+    """Identify the user for fair queuing."""
+    return request.headers.get('X-User-Id') or request.remote_addr or 'anonymous'
+
+def _text_hint(value):
+    """An optional text hint from a request, ignored ('') when it is not a string."""
+    return value if isinstance(value, str) else ''
+
+def _run_analysis(language, text, features, context_before='', context_after=''):
+    with prefetcher.foreground(), model_manager.processor(language) as processor:
+        result = analyze_with_context(_analyzer(language, processor), text, features,
+                                      context_before, context_after)
+        return result, processor.model_version
+
+# Opt-in traffic recording for replay with perf/replay.py
+traffic_recorder = None
+if os.environ.get('TRAFFIC_RECORD_PATH'):
+    traffic_recorder = TrafficRecorder(
+        os.environ['TRAFFIC_RECORD_PATH'],
+        sample_rate=float(os.environ.get('TRAFFIC_SAMPLE_RATE', 0)),
+        max_bytes=int(os.environ.get('TRAFFIC_MAX_BYTES', 50 * 1024 * 1024)),
+        backup_count=int(os.environ.get('TRAFFIC_BACKUP_COUNT', 5)),
+    )
+
+RECORDED_ENDPOINTS = {'analyze_text': 'analyze', 'check_answer': 'check', 'get_features': 'features'}
+
+@app.before_request
+def _start_timer():
+    g.request_started = time.perf_counter()
+    g.request_started_at = time.time()
+
+@app.after_request
+def _record_traffic(response):
+    duration = time.perf_counter() - g.request_started
+    # Lets perf/replay.py compare server time with the recorded durations
+    response.headers['Server-Timing'] = f'app;dur={duration * 1000:.2f}'
+    if traffic_recorder is not None and request.endpoint in RECORDED_ENDPOINTS:
+        try:
+            traffic_recorder.record(
+                RECORDED_ENDPOINTS[request.endpoint],
+                (request.view_args or {}).get('language', ''),
+                request.get_json(silent=True),
+                response.status_code,
+                g.request_started_at,
+                duration,
+                response.get_data(),
+            )
+        except Exception as e:
+            logger.error(f"Error recording traffic: {e}")
+    return response
 
 @app.route('/analyze/<language>', methods=['POST'])
 def analyze_text(language):
     """Analyze text for specific language features."""
     try:
-        if language not in language_processors:
+        if language not in model_manager:
             return jsonify({'error': f'Language {language} is not supported'}), 400
 
-        processor = language_processors[language]
         data = request.json
         
         if not data:
@@ -51,21 +200,93 @@ def analyze_text(language):
         if not text or not features:
             return jsonify({'error': 'Text and features are required'}), 400
 
-        result = processor.analyze_text(text, features)
-        return jsonify(result)
+        # Optional neighbouring chunks; only the sentence fragments crossing into
+        # this chunk are analyzed along with it
+        context_before, context_after = stitch_context(
+            text, _text_hint(data.get('context_before')), _text_hint(data.get('context_after')),
+            CONTEXT_MAX_CHARS)
+        # Optional hint: texts of the following chunks, in order
+        upcoming = data.get('prefetch')
+        upcoming = list(takewhile(lambda chunk: isinstance(chunk, str),
+                                  upcoming if isinstance(upcoming, list) else []))
+        key_text = context_key_text(context_before, text, context_after)
+
+        # The model version is part of the key so a hot-swap never serves stale results
+        version = model_manager.version(language)
+        key = cache_key(language, key_text, features, version)
+        result = analysis_cache.get(key)
+        if result is not None:
+            prefetcher.record_hit(key)
+        else:
+            # A running prefetch of this chunk is joined rather than repeated
+            result = prefetcher.claim(key, timeout=PREFETCH_JOIN_TIMEOUT)
+            if result is None:
+                future = analysis_lanes.submit(language, _client_id(),
+                                               partial(_run_analysis, language, text, features,
+                                                       context_before, context_after))
+                try:
+                    result, version = future.result(timeout=ANALYZE_TIMEOUT)
+                except TimeoutError:
+                    future.cancel()
+                    return jsonify({'error': 'Analysis timed out, please retry'}), 503
+                analysis_cache.put(cache_key(language, key_text, features, version), result)
 
+        # Upcoming chunks are analyzed in the background with the same context
+        # their own requests will send
+        if upcoming:
+            neighbours = [text] + upcoming + ['']
+            chunks = []
+            for i, chunk in enumerate(upcoming):
+                before, after = stitch_context(chunk, neighbours[i], neighbours[i + 2], CONTEXT_MAX_CHARS)
+                chunks.append((before, chunk, after))
+            prefetcher.submit(language, chunks, features, version)
+        return jsonify({**result, 'model_version': version})
+
+    except LaneFull:
+        return jsonify({'error': 'Too many analysis requests, please retry'}), 503, {'Retry-After': '1'}
     except Exception as e:
         logger.error(f"Error analyzing text: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/segment/<language>', methods=['POST'])
+def segment_text(language):
+    """Return sentence-aligned chunk boundaries for a text."""
+    try:
+        if language not in model_manager:
+            return jsonify({'error': f'Language {language} is not supported'}), 400
+
+        data = request.json
+
+        if not data or not data.get('text'):
+            return jsonify({'error': 'Text is required'}), 400
+
+        text = data['text']
+        if not isinstance(text, str):
+            return jsonify({'error': 'Text must be a string'}), 400
+        try:
+            chunk_size = int(data.get('chunk_size', 1000))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'chunk_size must be an integer'}), 400
+        if chunk_size <= 0:
+            return jsonify({'error': 'chunk_size must be positive'}), 400
+
+        chunks = [{'start': start, 'end': end} for start, end in chunk_boundaries(text, chunk_size)]
+        result = {'chunks': chunks}
+        if data.get('sentences'):
+            result['sentences'] = [{'start': start, 'end': end} for start, end in split_sentences(text)]
+        return jsonify(result)
+
+    except Exception as e:
+        logger.error(f"Error segmenting text: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @app.route('/check/<language>', methods=['POST'])
 def check_answer(language):
     """Check answer for specific language."""
     try:
-        if language not in language_processors:
+        if language not in model_manager:
             return jsonify({'error': f'Language {language} is not supported'}), 400
 
-        processor = language_processors[language]
         data = request.json
         
         if not data:
@@ -78,8 +299,9 @@ def check_answer(language):
         if not all([original, answer, feature]):
             return jsonify({'error': 'Original text, answer, and feature are required'}), 400
 
-        result = processor.check_answer(original, answer, feature)
-        return jsonify(result)
+        # Grading needs no model, so it never loads one or waits behind a load
+        result = grading.check_answer(language, original, answer, feature)
+        return jsonify({**result, 'model_version': model_manager.version(language)})
 
     except Exception as e:
         logger.error(f"Error checking answer: {e}")
@@ -89,17 +311,63 @@ def check_answer(language):
 def get_features(language):
     """Get available features for a specific language."""
     try:
-        if language not in language_processors:
+        if language not in model_manager:
             return jsonify({'error': f'Language {language} is not supported'}), 400
 
-        processor = language_processors[language]
-        features = processor.get_available_features()
-        return jsonify({'features': features})
+        return jsonify({'features': available_features(language),
+                        'model_version': model_manager.version(language)})
 
     except Exception as e:
         logger.error(f"Error getting features: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/admin/models', methods=['GET'])
+def model_stats():
+    """Report resident models, footprints, evictions and reloads."""
+    return jsonify(model_manager.stats())
+
+@app.route('/admin/cache', methods=['GET'])
+def cache_stats():
+    """Report analysis cache, sentence memo and prefetch hit rates."""
+    return jsonify({
+        'analysis': analysis_cache.stats(),
+        'sentences': sentence_memo.stats(),
+        'prefetch': prefetcher.stats()
+    })
+
+@app.route('/admin/lanes', methods=['GET'])
+def lane_stats():
+    """Report per-language analysis queue depth and wait times."""
+    return jsonify(analysis_lanes.stats())
+
+@app.route('/admin/models/<language>/swap', methods=['POST'])
+def swap_model(language):
+    """Load a new model version into a warm standby and swap it in atomically."""
+    try:
+        admin_token = os.environ.get('ADMIN_TOKEN', '')
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not admin_token or not hmac.compare_digest(supplied, admin_token):
+            return jsonify({'error': 'Forbidden'}), 403
+
+        if language not in model_manager:
+            return jsonify({'error': f'Language {language} is not supported'}), 400
+
+        data = request.json or {}
+        # Constructor arguments of the language's processor, e.g. {"model_name": "es_core_news_lg"}
+        options = data.get('options', {})
+        warmup = data.get('warmup') or WARMUP_TEXTS.get(language, [])
+        try:
+            inspect.signature(language_processors[language]).bind_partial(**options)
+        except TypeError as e:
+            return jsonify({'error': f'Invalid processor options: {e}'}), 400
+
+        result = model_manager.swap(language, partial(language_processors[language], **options), warmup)
+        return jsonify(result)
+
+    except Exception as e:
+        logger.error(f"Error swapping {language} model: {e}")
+        return jsonify({'error': 'Model swap failed; the previous model is still serving'}), 500
+
 if __name__ == '__main__':
     # app.run(port=5001, debug=True)
     port = int(os.environ.get('PORT', 5001))
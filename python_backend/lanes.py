@@ -0,0 +1,129 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class LaneFull(Exception):
+    """Raised when a lane's queue is at capacity."""
+
+
+class FairWorkerPool:
+    """Bounded worker pool that round-robins between users.
+
+    Each user has their own FIFO queue and workers take one job per user in
+    turn, so a user submitting many chunks cannot starve others. At most
+    ``max_queue`` jobs wait in total; beyond that submit() raises LaneFull
+    instead of letting requests pile up.
+    """
+
+    def __init__(self, name: str, workers: int = 2, max_queue: int = 64,
+                 slots: Optional[threading.Semaphore] = None):
+        self.name = name
+        self.slots = slots
+        self.workers = workers
+        self.max_queue = max_queue
+        self._queues: "OrderedDict[str, Deque[Tuple[Future, Callable[[], Any], float]]]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._waits: Deque[float] = deque(maxlen=1000)
+        for i in range(workers):
+            threading.Thread(target=self._run, name=f'lane-{name}-{i}', daemon=True).start()
+
+    def submit(self, user: str, fn: Callable[[], Any]) -> Future:
+        """Queue fn on behalf of user and return a Future for its result."""
+        future: Future = Future()
+        with self._cond:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise LaneFull(f'{self.name} lane is full')
+            self._queues.setdefault(user, deque()).append((future, fn, time.monotonic()))
+            self._queued += 1
+            self._cond.notify()
+        return future
+
+    def _next_job(self) -> Tuple[Future, Callable[[], Any], float]:
+        """Pop the next job, rotating the user to the back. Requires self._cond."""
+        user, jobs = next(iter(self._queues.items()))
+        job = jobs.popleft()
+        del self._queues[user]
+        if jobs:
+            self._queues[user] = jobs
+        self._queued -= 1
+        return job
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queues:
+                    self._cond.wait()
+                future, fn, enqueued = self._next_job()
+                if not future.set_running_or_notify_cancel():
+                    continue
+                self._running += 1
+                self._waits.append(time.monotonic() - enqueued)
+
+            try:
+                if self.slots is None:
+                    future.set_result(fn())
+                else:
+                    with self.slots:
+                        future.set_result(fn())
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._cond:
+                    self._running -= 1
+                    self._completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, throughput counters and queue-wait percentiles."""
+        with self._cond:
+            waits = sorted(self._waits)
+            return {
+                'workers': self.workers,
+                'queued': self._queued,
+                'running': self._running,
+                'users_waiting': len(self._queues),
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'wait_p50_ms': round(waits[len(waits) // 2] * 1000, 1) if waits else 0.0,
+                'wait_p99_ms': round(waits[int(len(waits) * 0.99)] * 1000, 1) if waits else 0.0,
+            }
+
+
+class LaneScheduler:
+    """One FairWorkerPool per lane (language), created on first use.
+
+    ``max_concurrent`` caps the jobs running across all lanes at once. Model
+    inference holds the GIL for long stretches, so every extra inference
+    thread makes request threads (and thus the fast endpoints) wait longer.
+    """
+
+    def __init__(self, workers: int = 2, max_queue: int = 64, max_concurrent: int = 0):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_concurrent = max_concurrent
+        self._slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+        self._pools: Dict[str, FairWorkerPool] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, lane: str, user: str, fn: Callable[[], Any]) -> Future:
+        """Queue fn in lane on behalf of user."""
+        with self._lock:
+            pool = self._pools.get(lane)
+            if pool is None:
+                pool = self._pools[lane] = FairWorkerPool(lane, self.workers, self.max_queue, self._slots)
+        return pool.submit(user, fn)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pools = dict(self._pools)
+        return {lane: pool.stats() for lane, pool in pools.items()}
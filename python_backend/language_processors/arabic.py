@@ -1,11 +1,20 @@
+import os
 import stanza
+from stanza.pipeline.core import DownloadMethod
+from stanza.resources.common import DEFAULT_MODEL_DIR
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+from language_processors.fingerprint import files_fingerprint
+from language_processors import grading
+from language_processors.features import available_features
+from language_processors.tagging import candidate, select_words
 
 logger = logging.getLogger(__name__)
 
 class ArabicProcessor:
-    def __init__(self):
+    def __init__(self, package: str = 'default'):
+        self.package = package
+        self.model_version = None
         self.nlp = None
         try:
             self.initialize_models()
@@ -16,9 +25,16 @@ class ArabicProcessor:
     def initialize_models(self):
         """Initialize Stanza model."""
         try:
-            stanza.download('ar')
-            self.nlp = stanza.Pipeline('ar', processors='tokenize,pos,lemma', use_gpu=False)
-            
+            # Reuse the local resources.json (the default re-downloads it on every load);
+            # only missing models are downloaded
+            self.nlp = stanza.Pipeline('ar', dir=DEFAULT_MODEL_DIR, package=self.package,
+                                       processors='tokenize,pos,lemma', use_gpu=False,
+                                       download_method=DownloadMethod.REUSE_RESOURCES)
+            # The loaded model files, not just the library version, identify the model
+            loaded = {os.path.relpath(path, DEFAULT_MODEL_DIR) for key, path in self.nlp.config.items()
+                      if key.endswith('_path') and isinstance(path, str) and os.path.isfile(path)}
+            self.model_version = (f"stanza-{stanza.__version__}-ar-{self.package}-"
+                                  f"{files_fingerprint(DEFAULT_MODEL_DIR, loaded.__contains__)}")
             self._test_pipeline()
         except Exception as e:
             logger.error(f"Error initializing models: {e}")
@@ -78,81 +94,64 @@ class ArabicProcessor:
         
         return None
 
-    def analyze_text(self, text: str, features: List[str]) -> Dict[str, Any]:
-        """Analyze Arabic text for specific grammatical features."""
+    def get_span(self, word, text: str) -> Tuple[int, int]:
+        """Return the exact (start, end) character offsets of a word in text.
+
+        Clitics split off a multi-word token (e.g. و + كتب) have no offsets of
+        their own; they are located inside their token's span, or get the
+        whole token when their form differs from the surface text.
+        """
+        if getattr(word, 'start_char', None) is not None:
+            return word.start_char, word.end_char
+        token = word.parent
+        index = text.find(word.text, token.start_char, token.end_char)
+        if index < 0:
+            return token.start_char, token.end_char
+        return index, index + len(word.text)
+
+    def tag_text(self, text: str) -> List[Dict[str, Any]]:
+        """Tag every word with its grammatical feature (see language_processors.tagging)."""
         
         try:
             doc = self.nlp(text)
-            words_to_practice = []
-            current_position = 0
+            candidates = []
             
             for sent in doc.sentences:
                 for word in sent.words:
                     # Skip punctuation
                     if word.upos == "PUNCT":
-                        current_position += len(word.text)
                         continue
                         
                     feature = self.get_feature(word)
                     
-                    if feature and feature in features:
-                        words_to_practice.append({
-                            'original': word.text,
+                    if feature:
+                        # Offsets must be exact: batching and context stitching map words back by position
+                        start, end = self.get_span(word, text)
+                        candidates.append(candidate(start, feature, [{
+                            'original': text[start:end],
                             'display': self.get_lemma(word),
-                            'position': current_position,
-                            'length': len(word.text),
+                            'position': start,
+                            'length': end - start,
                             'feature': feature
-                        })
-                    
-                    current_position += len(word.text)
+                        }]))
             
-            return {
-                'text': text,
-                'words': words_to_practice
-            }
+            return candidates
 
         except Exception as e:
             logger.error(f"Error analyzing text: {e}")
             raise
+
+    def analyze_text(self, text: str, features: List[str]) -> Dict[str, Any]:
+        """Analyze Arabic text for specific grammatical features."""
+        return {
+            'text': text,
+            'words': select_words(self.tag_text(text), features)
+        }
             
     def check_answer(self, original: str, answer: str, feature: str) -> Dict[str, Any]:
         """Check if the answer matches the original form."""
-        try:
-
-            # Clean up and normalize the strings for comparison
-            original_clean = original.strip()
-            answer_clean = answer.strip()
-            
-            is_correct = original_clean == answer_clean
-            
-            message = 'صحيح!' if is_correct else f'غير صحيح. الشكل الصحيح هو "{original}"'
-            
-            # Add specific messages for different features
-            if not is_correct:
-                if feature in ['past', 'present', 'future']:
-                    message += ' (زمن الفعل)'
-                elif feature in ['nominal', 'accusative', 'genitive']:
-                    message += ' (حالة الإعراب)'
-                elif feature in ['dual', 'plural']:
-                    message += ' (العدد)'
-
-            return {
-                'correct': is_correct,
-                'message': message
-            }
-        except Exception as e:
-            logger.error(f"Error checking answer: {e}")
-            raise
+        return grading.check_answer('arabic', original, answer, feature)
 
     def get_available_features(self) -> List[str]:
         """Return available grammatical features for Arabic."""
-        return [
-            'past',      # الماضي
-            'present',   # المضارع
-            'future',    # المستقبل
-            'dual',      # المثنى
-            'plural',    # الجمع
-            'nominal',   # الرفع
-            'accusative', # النصب
-            'genitive'   # الجر
-        ]
\ No newline at end of file
+        return available_features('arabic')
\ No newline at end of file
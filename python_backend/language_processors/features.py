@@ -0,0 +1,34 @@
+from typing import List
+
+# language -> grammatical features the processor can highlight, in display order
+FEATURES = {
+    'russian': ['nominative', 'genitive', 'dative', 'accusative', 'instrumental', 'prepositional'],
+    'spanish': ['simple_present', 'present_continuous', 'imperfect', 'preterite',
+                'present_perfect', 'simple_future', 'conditional', 'present_subjunctive'],
+    'french': ['present_simple', 'present_continuous', 'imparfait', 'passe_compose',
+               'future_simple', 'conditional', 'subjonctif'],
+    'hebrew': [
+        'past',      # עבר
+        'present',   # הווה
+        'future',    # עתיד
+        'plurals',   # רבים
+    ],
+    'arabic': [
+        'past',       # الماضي
+        'present',    # المضارع
+        'future',     # المستقبل
+        'dual',       # المثنى
+        'plural',     # الجمع
+        'nominal',    # الرفع
+        'accusative', # النصب
+        'genitive',   # الجر
+    ],
+}
+
+
+def available_features(language: str) -> List[str]:
+    """Return the features for language.
+
+    Needs no model, so /features never loads or waits for one.
+    """
+    return list(FEATURES[language])
@@ -0,0 +1,27 @@
+import hashlib
+import os
+from typing import Callable, Optional
+
+
+def files_fingerprint(root: str, select: Optional[Callable[[str], bool]] = None) -> str:
+    """Short digest of the names, sizes and contents of the model files under root.
+
+    ``select`` picks files by their path relative to root (default: all).
+    Only relative paths and contents are hashed, so the same weights give
+    the same digest on every machine and after every re-download, and
+    different weights never do.
+    """
+    h = hashlib.blake2b(digest_size=6)
+    files = sorted(
+        os.path.relpath(os.path.join(directory, name), root)
+        for directory, _, names in os.walk(root) for name in names
+    )
+    for relative in files:
+        if select is not None and not select(relative):
+            continue
+        path = os.path.join(root, relative)
+        h.update(f'{relative.replace(os.sep, "/")}\0{os.path.getsize(path)}\0'.encode('utf-8'))
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+    return h.hexdigest()
@@ -1,12 +1,16 @@
 import spacy
 import logging
 from typing import List, Dict, Any, Optional, Tuple
-import unicodedata
+from language_processors import grading
+from language_processors.features import available_features
+from language_processors.tagging import candidate, select_words
 
 logger = logging.getLogger(__name__)
 
 class FrenchProcessor:
-    def __init__(self):
+    def __init__(self, model_name: str = 'fr_core_news_md'):
+        self.model_name = model_name
+        self.model_version = None
         self.nlp = None
         try:
             self.initialize_models()
@@ -16,17 +20,13 @@ class FrenchProcessor:
 
     def initialize_models(self):
         """Initialize spaCy model."""
-        self.nlp = spacy.load('fr_core_news_md')
+        self.nlp = spacy.load(self.model_name)
+        self.model_version = f"{self.model_name}-{self.nlp.meta.get('version', '')}"
 
     def get_infinitive(self, token) -> str:
         """Get the infinitive form of a verb."""
         return token.lemma_
 
-    def remove_accents(self, text: str) -> str:
-        """Remove diacritics from text while preserving base characters."""
-        return ''.join(c for c in unicodedata.normalize('NFD', text)
-                      if unicodedata.category(c) != 'Mn')
-
     def get_tense_aspect_mood(self, token) -> Dict[str, str]:
         """Extract tense, aspect, and mood information from a token."""
         morph = token.morph
@@ -37,141 +37,94 @@ class FrenchProcessor:
             'VerbForm': morph.get('VerbForm', [''])[0]
         }
 
-    def analyze_text(self, text: str, features: List[str]) -> Dict[str, Any]:
-        """Analyze French text for specific grammatical features."""
+    def _word(self, token, feature: str, display: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            'original': token.text,
+            'display': token.lemma_ if display is None else display,
+            'position': token.idx,
+            'length': len(token.text),
+            'feature': feature
+        }
+
+    def tag_text(self, text: str) -> List[Dict[str, Any]]:
+        """Tag French text for every feature at once (see language_processors.tagging).
+
+        Rules are listed in the order analyze_text tries them. The compound
+        tenses claim the verb whenever they are selected, even when the
+        construction is absent, so they are always listed.
+        """
         try:
             doc = self.nlp(text)
-            words_to_practice = []
+            candidates = []
 
             for i, token in enumerate(doc):
-                properties = self.get_tense_aspect_mood(token)
-                logger.debug(f"Token: {token.text}, Properties: {properties}")
-
                 if token.pos_ not in ['VERB', 'AUX']:
                     continue
 
-                detected_feature = None
+                properties = self.get_tense_aspect_mood(token)
+                logger.debug(f"Token: {token.text}, Properties: {properties}")
+
+                def add(feature: str, words: List[Dict[str, Any]]):
+                    candidates.append(candidate(token.idx, feature, words))
 
                 # Present Simple
-                if ('present_simple' in features and 
-                    properties['Tense'] == 'Pres' and 
+                if (properties['Tense'] == 'Pres' and
                     properties['Mood'] == 'Ind' and
                     properties['VerbForm'] == 'Fin'):
-                    detected_feature = 'present_simple'
-                
-                # Present Continuous
-                elif 'present_continuous' in features:
-                    # Check for être en train de + infinitive
-                    if (token.lemma_ == 'être' and 
-                        i + 4 < len(doc) and
-                        doc[i + 1].text.lower() == 'en' and
-                        doc[i + 2].text.lower() == 'train' and
-                        doc[i + 3].text.lower() == 'de'):
-                        words_to_practice.append({
-                            'original': doc[i + 4].text,
-                            'display': doc[i + 4].lemma_,
-                            'position': doc[i + 4].idx,
-                            'length': len(doc[i + 4].text),
-                            'feature': 'present_continuous'
-                        })
-                        continue
-                
+                    add('present_simple', [self._word(token, 'present_simple', self.get_infinitive(token))])
+
+                # Present Continuous: être en train de + infinitive, only the infinitive is practised
+                if (token.lemma_ == 'être' and
+                    i + 4 < len(doc) and
+                    doc[i + 1].text.lower() == 'en' and
+                    doc[i + 2].text.lower() == 'train' and
+                    doc[i + 3].text.lower() == 'de'):
+                    add('present_continuous', [self._word(doc[i + 4], 'present_continuous')])
+                else:
+                    add('present_continuous', [])
+
                 # Imparfait
-                elif ('imparfait' in features and 
-                      properties['Tense'] == 'Imp' and 
-                      properties['Mood'] == 'Ind'):
-                    detected_feature = 'imparfait'
-                
-                # Passé Composé
-                elif 'passe_compose' in features:
-                    # Check for avoir/être + past participle
-                    if ((token.lemma_ in ['avoir', 'être']) and 
-                        i + 1 < len(doc) and 
-                        doc[i + 1].morph.get('VerbForm', [''])[0] == 'Part'):
-                        words_to_practice.append({
-                            'original': token.text,
-                            'display': token.lemma_,
-                            'position': token.idx,
-                            'length': len(token.text),
-                            'feature': 'passe_compose_aux'
-                        })
-                        words_to_practice.append({
-                            'original': doc[i + 1].text,
-                            'display': doc[i + 1].lemma_,
-                            'position': doc[i + 1].idx,
-                            'length': len(doc[i + 1].text),
-                            'feature': 'passe_compose_main'
-                        })
-                        continue
+                if properties['Tense'] == 'Imp' and properties['Mood'] == 'Ind':
+                    add('imparfait', [self._word(token, 'imparfait', self.get_infinitive(token))])
+
+                # Passé Composé: avoir/être + past participle
+                if (token.lemma_ in ['avoir', 'être'] and
+                    i + 1 < len(doc) and
+                    doc[i + 1].morph.get('VerbForm', [''])[0] == 'Part'):
+                    add('passe_compose', [self._word(token, 'passe_compose_aux'),
+                                          self._word(doc[i + 1], 'passe_compose_main')])
+                else:
+                    add('passe_compose', [])
 
                 # Future Simple
-                elif ('future_simple' in features and 
-                      properties['Tense'] == 'Fut'):
-                    detected_feature = 'future_simple'
-                
+                if properties['Tense'] == 'Fut':
+                    add('future_simple', [self._word(token, 'future_simple', self.get_infinitive(token))])
+
                 # Conditional
-                elif ('conditional' in features and 
-                      properties['Mood'] == 'Cnd'):
-                    detected_feature = 'conditional'
-                
+                if properties['Mood'] == 'Cnd':
+                    add('conditional', [self._word(token, 'conditional', self.get_infinitive(token))])
+
                 # Subjonctif Present
-                elif ('subjonctif' in features and 
-                      properties['Mood'] == 'Sub' and 
-                      properties['Tense'] == 'Pres'):
-                    detected_feature = 'subjonctif'
-
-                if detected_feature:
-                    words_to_practice.append({
-                        'original': token.text,
-                        'display': self.get_infinitive(token),
-                        'position': token.idx,
-                        'length': len(token.text),
-                        'feature': detected_feature
-                    })
-
-            return {
-                'text': text,
-                'words': words_to_practice
-            }
+                if properties['Mood'] == 'Sub' and properties['Tense'] == 'Pres':
+                    add('subjonctif', [self._word(token, 'subjonctif', self.get_infinitive(token))])
+
+            return candidates
 
         except Exception as e:
             logger.error(f"Error analyzing text: {e}")
             raise
 
+    def analyze_text(self, text: str, features: List[str]) -> Dict[str, Any]:
+        """Analyze French text for specific grammatical features."""
+        return {
+            'text': text,
+            'words': select_words(self.tag_text(text), features)
+        }
+
     def check_answer(self, original: str, answer: str, feature: str) -> Dict[str, Any]:
         """Check if the answer matches the original conjugated form."""
-        try:
-            # Remove accents from both original and answer for comparison
-            original_clean = self.remove_accents(original.lower().strip())
-            answer_clean = self.remove_accents(answer.lower().strip())
-            
-            is_correct = original_clean == answer_clean
-            message = 'Correct!' if is_correct else f'Incorrect. The correct form is "{original}"'
-
-            if not is_correct:
-                if feature == 'passe_compose_aux':
-                    message += ' (conjugated form of avoir/être)'
-                elif feature == 'passe_compose_main':
-                    message += ' (past participle)'
-                elif feature == 'present_continuous':
-                    message += ' (infinitive form)'
-
-            return {
-                'correct': is_correct,
-                'message': message
-            }
-        except Exception as e:
-            logger.error(f"Error checking answer: {e}")
-            raise
+        return grading.check_answer('french', original, answer, feature)
 
     def get_available_features(self) -> List[str]:
         """Return available grammatical features for French."""
-        return [
-            'present_simple',
-            'present_continuous',
-            'imparfait',
-            'passe_compose',
-            'future_simple',
-            'conditional',
-            'subjonctif'
-        ]
\ No newline at end of file
+        return available_features('french')
\ No newline at end of file
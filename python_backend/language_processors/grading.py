@@ -0,0 +1,40 @@
+from typing import Any, Dict
+
+from language_processors.normalization import answers_match
+
+# language -> (correct message, incorrect message, {feature: hint appended when incorrect})
+_MESSAGES = {
+    'russian': ('Correct!', 'Incorrect. The correct declined form is "{original}"', {}),
+    'spanish': ('Correct!', 'Incorrect. The correct form is "{original}"', {
+        'present_perfect_aux': ' (conjugated form of haber)',
+        'present_perfect_main': ' (past participle)',
+        'present_continuous': ' (gerund form)',
+    }),
+    'french': ('Correct!', 'Incorrect. The correct form is "{original}"', {
+        'passe_compose_aux': ' (conjugated form of avoir/être)',
+        'passe_compose_main': ' (past participle)',
+        'present_continuous': ' (infinitive form)',
+    }),
+    'hebrew': ('נכון!', 'לא נכון. הצורה הנכונה היא "{original}"', {
+        'past': ' (צורת הפועל)', 'present': ' (צורת הפועל)', 'future': ' (צורת הפועל)',
+        'plurals': ' (צורת הרבים)',
+    }),
+    'arabic': ('صحيح!', 'غير صحيح. الشكل الصحيح هو "{original}"', {
+        'past': ' (زمن الفعل)', 'present': ' (زمن الفعل)', 'future': ' (زمن الفعل)',
+        'nominal': ' (حالة الإعراب)', 'accusative': ' (حالة الإعراب)', 'genitive': ' (حالة الإعراب)',
+        'dual': ' (العدد)', 'plural': ' (العدد)',
+    }),
+}
+
+
+def check_answer(language: str, original: str, answer: str, feature: str) -> Dict[str, Any]:
+    """Grade a learner's answer against the original form.
+
+    Needs no model, so /check never loads or waits for one.
+    """
+    is_correct = answers_match(original, answer, language)
+    correct, incorrect, hints = _MESSAGES[language]
+    return {
+        'correct': is_correct,
+        'message': correct if is_correct else incorrect.format(original=original) + hints.get(feature, '')
+    }
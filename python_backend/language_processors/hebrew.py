@@ -1,12 +1,19 @@
+import os
 import trankit
 import logging
 import numpy as np
 from typing import List, Dict, Any, Optional
+from language_processors.fingerprint import files_fingerprint
+from language_processors import grading
+from language_processors.features import available_features
+from language_processors.tagging import candidate, select_words
 
 logger = logging.getLogger(__name__)
 
 class HebrewProcessor:
-    def __init__(self):
+    def __init__(self, cache_dir: str = './cache'):
+        self.cache_dir = cache_dir
+        self.model_version = None
         self.nlp = None
         try:
             self.initialize_models()
@@ -18,7 +25,11 @@ class HebrewProcessor:
         """Initialize Trankit model for Hebrew."""
         try:
             # Initialize the pipeline for Hebrew with specific configurations
-            self.nlp = trankit.Pipeline('hebrew', cache_dir='./cache', gpu=False)
+            self.nlp = trankit.Pipeline('hebrew', cache_dir=self.cache_dir, gpu=False)
+            # Hebrew weights live under cache_dir/<embedding>/hebrew, so new weights get
+            # a new version (and new cache keys)
+            hebrew_files = lambda path: 'hebrew' in path.split(os.sep)
+            self.model_version = f"trankit-{trankit.__version__}-hebrew-{files_fingerprint(self.cache_dir, hebrew_files)}"
             # self._test_pipeline()  # Test if pipeline works
         except Exception as e:
             logger.error(f"Error initializing models: {e}")
@@ -83,72 +94,46 @@ class HebrewProcessor:
             logger.error(f"Error getting verb tense for word {word_info.get('text', '')}: {e}")
             return None
 
-    def analyze_text(self, text: str, features: List[str]) -> Dict[str, Any]:
-        """Analyze Hebrew text for specific grammatical features."""
+    def tag_text(self, text: str) -> List[Dict[str, Any]]:
+        """Tag every verb with its tense (see language_processors.tagging)."""
         
         try:
             # Process the text with Trankit
             doc = self.nlp(text)
-            words_to_practice = []
+            candidates = []
             
             for sent in doc['sentences']:
                 for word in sent['tokens']:
                     word_info = self._safe_get_word_info(word)
                     
                     # Handle verb tenses
-                    if any(feat in features for feat in ['past', 'present', 'future']):
-                        tense = self.get_verb_tense(word_info)
-                        if tense and tense in features:
-                            words_to_practice.append({
-                                'original': word_info['text'],
-                                'display': word_info['lemma'],
-                                'position': word_info['dspan'][0],
-                                'length': word_info['dspan'][1] - word_info['dspan'][0],
-                                'feature': tense
-                            })
-                            continue
-
+                    tense = self.get_verb_tense(word_info)
+                    if tense:
+                        candidates.append(candidate(word_info['dspan'][0], tense, [{
+                            'original': word_info['text'],
+                            'display': word_info['lemma'],
+                            'position': word_info['dspan'][0],
+                            'length': word_info['dspan'][1] - word_info['dspan'][0],
+                            'feature': tense
+                        }]))
 
-            return {
-                'text': text,
-                'words': words_to_practice
-            }
+            return candidates
 
         except Exception as e:
             logger.error(f"Error analyzing text: {e}")
             raise
 
+    def analyze_text(self, text: str, features: List[str]) -> Dict[str, Any]:
+        """Analyze Hebrew text for specific grammatical features."""
+        return {
+            'text': text,
+            'words': select_words(self.tag_text(text), features)
+        }
+
     def check_answer(self, original: str, answer: str, feature: str) -> Dict[str, Any]:
         """Check if the answer matches the original form."""
-        try:
-            # Clean up the strings for comparison
-            original_clean = original.strip()
-            answer_clean = answer.strip()
-            
-            is_correct = original_clean == answer_clean
-            
-            message = 'נכון!' if is_correct else f'לא נכון. הצורה הנכונה היא "{original}"'
-            
-            # Add specific messages for different features
-            if not is_correct:
-                if feature in ['past', 'present', 'future']:
-                    message += ' (צורת הפועל)'
-                elif feature == 'plurals':
-                    message += ' (צורת הרבים)'
-
-            return {
-                'correct': is_correct,
-                'message': message
-            }
-        except Exception as e:
-            logger.error(f"Error checking answer: {e}")
-            raise
+        return grading.check_answer('hebrew', original, answer, feature)
 
     def get_available_features(self) -> List[str]:
         """Return available grammatical features for Hebrew."""
-        return [
-            'past',      # עבר
-            'present',   # הווה
-            'future',    # עתיד
-            'plurals'    # רבים
-        ]
\ No newline at end of file
+        return available_features('hebrew')
\ No newline at end of file
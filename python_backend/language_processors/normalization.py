@@ -0,0 +1,105 @@
+import hashlib
+import unicodedata
+from typing import Dict, Iterable, Optional, Tuple
+
+# Combining marks that carry no lexical information for a learner's answer.
+_LATIN_MARKS = range(0x0300, 0x0370)
+
+# Russian: stress marks (acute/grave) and the diaeresis that turns е into ё.
+# The breve (U+0306) is deliberately kept so that й survives recomposition.
+_RUSSIAN_MARKS = (0x0300, 0x0301, 0x0308)
+
+# Hebrew: cantillation marks, niqqud, dagesh, shin/sin dots, rafe.
+_HEBREW_MARKS = (
+    list(range(0x0591, 0x05BE)) + [0x05BF, 0x05C1, 0x05C2, 0x05C4, 0x05C5, 0x05C7]
+)
+
+# Arabic: Quranic annotation signs, harakat/tanwin/shadda/sukun, superscript
+# alef, small high signs, and tatweel. Madda and hamza above/below are kept so
+# that decomposed input recomposes onto its carrier before alef folding.
+_ARABIC_MARKS = (
+    list(range(0x0610, 0x061B)) + list(range(0x064B, 0x0653)) + list(range(0x0656, 0x0660))
+    + [0x0670] + list(range(0x06D6, 0x06EE)) + [0x0640]
+)
+
+# Explicit letter folds applied on top of mark removal.
+_RUSSIAN_FOLDS = {'ё': 'е', 'Ё': 'е', 'ѐ': 'е', 'ѝ': 'и'}
+_ARABIC_FOLDS = {'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا', 'ٲ': 'ا', 'ٳ': 'ا'}
+
+
+def _build_table(marks: Iterable[int], precomposed: Iterable[range],
+                 folds: Optional[Dict[str, str]] = None,
+                 compatibility: bool = False) -> Dict[int, Optional[str]]:
+    """Build a str.translate table that folds precomposed letters and drops marks.
+
+    Every code point in ``precomposed`` is decomposed once at import time and
+    mapped straight to its mark-free form, so NFC input never has to go
+    through ``unicodedata.normalize`` at request time.
+    """
+    drop = frozenset(marks)
+    folds = folds or {}
+    form = 'NFKD' if compatibility else 'NFD'
+    table: Dict[int, Optional[str]] = {cp: None for cp in drop}
+
+    for block in precomposed:
+        for cp in block:
+            char = chr(cp)
+            if unicodedata.category(char) == 'Cn':
+                continue
+            stripped = ''.join(
+                folds.get(c, c) for c in unicodedata.normalize(form, char)
+                if ord(c) not in drop
+            )
+            if stripped != char:
+                table[cp] = stripped
+
+    for source, target in folds.items():
+        table[ord(source)] = target
+    return table
+
+
+# language -> (translate table, whether the result may need NFC recomposition)
+_PROFILES: Dict[str, Tuple[Dict[int, Optional[str]], bool]] = {
+    'spanish': (_build_table(_LATIN_MARKS, [range(0x00C0, 0x0250), range(0x1E00, 0x1F00)]), False),
+    'french': (_build_table(_LATIN_MARKS, [range(0x00C0, 0x0250), range(0x1E00, 0x1F00)]), False),
+    'russian': (_build_table(_RUSSIAN_MARKS, [], _RUSSIAN_FOLDS), True),
+    'hebrew': (_build_table(_HEBREW_MARKS, [range(0xFB1D, 0xFB50)]), False),
+    'arabic': (_build_table(_ARABIC_MARKS, [range(0xFB50, 0xFE00), range(0xFE70, 0xFF00)],
+                            _ARABIC_FOLDS, compatibility=True), True),
+}
+
+
+def normalize_answer(text: str, language: str) -> str:
+    """Normalize a word for grading: trim, lowercase and fold language-specific diacritics."""
+    text = text.strip().lower()
+    if text.isascii():
+        return text
+
+    profile = _PROFILES.get(language)
+    if profile is None:
+        return unicodedata.normalize('NFC', text)
+
+    table, recompose = profile
+    text = text.translate(table)
+    if recompose and not unicodedata.is_normalized('NFC', text):
+        text = unicodedata.normalize('NFC', text).translate(table)
+    return text
+
+
+def answers_match(original: str, answer: str, language: str) -> bool:
+    """Compare two answers after language-specific normalization."""
+    return normalize_answer(original, language) == normalize_answer(answer, language)
+
+
+def cache_key(language: str, text: str, features: Iterable[str],
+              version: str = '') -> str:
+    """Build a stable cache key for an analysis request.
+
+    Language and features are canonicalized (case, order, duplicates) so that
+    equivalent requests share an entry. The text itself is hashed verbatim:
+    analysis results carry character offsets into it, so two texts that only
+    differ in diacritics or normalization form must not share a result.
+    """
+    canonical_features = ','.join(sorted({f.strip().lower() for f in features if f}))
+    digest = hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+    return f"{language.strip().lower()}|{version}|{canonical_features}|{digest}"
@@ -1,12 +1,38 @@
 import spacy
+from functools import lru_cache
 from typing import List, Dict, Any, Optional, Tuple
 import logging
 import pymorphy3 
+from language_processors import grading
+from language_processors.features import available_features
+from language_processors.tagging import candidate, select_words
 
 logger = logging.getLogger(__name__)
 
 class RussianProcessor:
-    def __init__(self):
+    case_mapping = {
+        'nom': 'nominative', 'gen': 'genitive', 'dat': 'dative',
+        'acc': 'accusative', 'abl': 'instrumental', 'loc': 'prepositional',
+        'nomn': 'nominative', 'gent': 'genitive', 'datv': 'dative',
+        'accs': 'accusative', 'ablt': 'instrumental', 'loct': 'prepositional',
+        'ins': 'instrumental',
+        # pymorphy3 secondary cases
+        'gen2': 'genitive', 'acc2': 'accusative', 'loc2': 'prepositional'
+    }
+
+    # Parts of speech that can carry case when spaCy leaves it untagged
+    NOMINAL_POS = {'NOUN', 'PROPN', 'PRON', 'ADJ', 'DET', 'NUM'}
+
+    # Weight of spaCy's vote; pymorphy3 parse scores for a form sum to ~1
+    SPACY_VOTE_WEIGHT = 0.75
+
+    # Distinct word forms whose pymorphy3 parses are kept across requests
+    PARSE_CACHE_SIZE = 50000
+
+    def __init__(self, model_name: str = 'ru_core_news_md', morph_path: Optional[str] = None):
+        self.model_name = model_name
+        self.morph_path = morph_path
+        self.model_version = None
         self.nlp_spacy = None
         try:
             self.initialize_models()
@@ -15,98 +41,114 @@ class RussianProcessor:
             raise
         
     def initialize_models(self):
-        """Initialize spaCy"""
-        self.nlp_spacy = spacy.load('ru_core_news_md')
-        self.morph = pymorphy3.MorphAnalyzer()
+        """Initialize spaCy and pymorphy3"""
+        self.nlp_spacy = spacy.load(self.model_name)
+        if self.morph_path:
+            self.morph = pymorphy3.MorphAnalyzer(path=self.morph_path)
+        else:
+            self.morph = pymorphy3.MorphAnalyzer()
+        dictionary_meta = getattr(getattr(self.morph, 'dictionary', None), 'meta', None) or {}
+        self.model_version = (
+            f"{self.model_name}-{self.nlp_spacy.meta.get('version', '')}"
+            f"+pymorphy3-dicts-{dictionary_meta.get('source_revision', dictionary_meta.get('compiled_at', ''))}"
+        )
+        self._parse = lru_cache(maxsize=self.PARSE_CACHE_SIZE)(self.morph.parse)
+        self.get_pymorphy_case_scores = lru_cache(maxsize=self.PARSE_CACHE_SIZE)(
+            self.get_pymorphy_case_scores)
 
     def get_nominative_form(self, word: str) -> str:
         """Get the nominative form of a word using pymorphy3."""
         try:
-            parsed = self.morph.parse(word)[0]
+            parsed = self._parse(word)[0]
             nom_form = parsed.inflect({'nomn'})
             return nom_form.word if nom_form else word
         except Exception as e:
             logger.error(f"Error getting nominative form for {word}: {e}")
             return word
 
-    def get_case(self, word: str, position: int, doc_spacy) -> Dict[str, int]:
-        """Get case votes from all three models."""
-        case_mapping = {
-            'nom': 'nominative', 'gen': 'genitive', 'dat': 'dative',
-            'acc': 'accusative', 'abl': 'instrumental', 'loc': 'prepositional',
-            'nomn': 'nominative', 'gent': 'genitive', 'datv': 'dative',
-            'accs': 'accusative', 'ablt': 'instrumental', 'loct': 'prepositional',
-            'ins': 'instrumental'
-        }
-        
-        votes = {
-            'nominative': 0, 'genitive': 0, 'dative': 0,
-            'accusative': 0, 'instrumental': 0, 'prepositional': 0
-        }
+    def get_pymorphy_case_scores(self, form: str) -> Tuple[Tuple[str, float], ...]:
+        """Return pymorphy3's case opinion for a lowercased word form.
 
-        token_spacy = [t for t in doc_spacy if t.idx == position][0]
+        Scores of all parses are summed per case, so a form whose paradigm
+        allows a single case yields exactly one entry.
+        """
+        scores: Dict[str, float] = {}
+        for parse in self._parse(form):
+            case = self.case_mapping.get(parse.tag.case or '')
+            if case:
+                scores[case] = scores.get(case, 0.0) + parse.score
+        return tuple(sorted(scores.items(), key=lambda item: -item[1]))
 
+    def may_have_case(self, token_spacy) -> bool:
+        """Whether get_case can return a case for the token, i.e. whether pymorphy3 needs to parse it."""
+        return (token_spacy.pos_ in self.NOMINAL_POS or bool(token_spacy.morph.get('Case'))) and \
+            any(char.isalpha() for char in token_spacy.text)
+
+    def get_case(self, token_spacy, pymorphy_scores: Dict[str, Tuple[Tuple[str, float], ...]]) -> Optional[str]:
+        """Get the case of a token by voting between spaCy and pymorphy3."""
         spacy_case = token_spacy.morph.get('Case')
-        if spacy_case:
-            case = case_mapping.get(spacy_case[0].lower())
-            return case
+        spacy_vote = self.case_mapping.get(spacy_case[0].lower()) if spacy_case else None
 
+        if spacy_vote is None and token_spacy.pos_ not in self.NOMINAL_POS:
+            return None
 
-    def analyze_text(self, text: str, features: List[str]) -> Dict[str, Any]:
-        """Analyze Russian text for specific cases with multi-model voting."""
+        pymorphy_votes = pymorphy_scores.get(token_spacy.text.lower(), ())
+
+        # Unambiguous cases: no real vote is needed
+        if not pymorphy_votes:
+            return spacy_vote
+        if len(pymorphy_votes) == 1 and spacy_vote in (None, pymorphy_votes[0][0]):
+            return pymorphy_votes[0][0]
+        if spacy_vote is None:
+            return pymorphy_votes[0][0]
+
+        votes = dict(pymorphy_votes)
+        # spaCy sees the sentence context, pymorphy3 only the word form
+        votes[spacy_vote] = votes.get(spacy_vote, 0.0) + self.SPACY_VOTE_WEIGHT
+        return max(votes, key=lambda case: (votes[case], case == spacy_vote))
+
+    def tag_text(self, text: str) -> List[Dict[str, Any]]:
+        """Tag every case-bearing word (see language_processors.tagging)."""
         try:
-            # Process text with both models
             doc_spacy = self.nlp_spacy(text)
-            
-            words_to_practice = []
+
+            # Parse each distinct word form that can carry case once per document
+            forms = {token.text.lower() for token in doc_spacy if self.may_have_case(token)}
+            pymorphy_scores = {form: self.get_pymorphy_case_scores(form) for form in forms}
+
+            candidates = []
             
             for token in doc_spacy:
                 if not any(char.isalpha() for char in token.text):
                     continue
 
-                case = self.get_case(token.text, token.idx, doc_spacy)
-                
+                case = self.get_case(token, pymorphy_scores)
 
-                if case and case in features:
-                    # Get nominative form for display
-                    nominative_form = self.get_nominative_form(token.text)
-                    
-                    words_to_practice.append({
+                if case:
+                    candidates.append(candidate(token.idx, case, [{
                         'original': token.text,  # Keep original declined form for checking
-                        'display': nominative_form,  # Add nominative form for display
+                        'display': self.get_nominative_form(token.text),  # Nominative form for display
                         'position': token.idx,
                         'length': len(token.text),
                         'feature': case
-                    })
+                    }]))
             
-            return {
-                'text': text,
-                'words': words_to_practice
-            }
+            return candidates
         except Exception as e:
             logger.error(f"Error analyzing text: {e}")
             raise
+
+    def analyze_text(self, text: str, features: List[str]) -> Dict[str, Any]:
+        """Analyze Russian text for specific cases with multi-model voting."""
+        return {
+            'text': text,
+            'words': select_words(self.tag_text(text), features)
+        }
         
     def check_answer(self, original: str, answer: str, feature: str) -> Dict[str, Any]:
         """Check if the answer matches the original declined form."""
-        try:
-            # Compare with the original declined form
-            is_correct = answer.lower() == original.lower()
-            return {
-                'correct': is_correct,
-                'message': 'Correct!' if is_correct else f'Incorrect. The correct declined form is "{original}"'
-            }
-        except Exception as e:
-            logger.error(f"Error checking answer: {e}")
-            raise
-        
+        return grading.check_answer('russian', original, answer, feature)
+
     def get_available_features(self) -> List[str]:
         """Return available grammatical cases for Russian."""
-        return [
-            'nominative',
-            'genitive',
-            'dative',
-            'accusative',
-            'instrumental',
-            'prepositional'
-        ]
\ No newline at end of file
+        return available_features('russian')
\ No newline at end of file
@@ -1,12 +1,16 @@
 import spacy
 import logging
 from typing import List, Dict, Any, Optional, Tuple
-import unicodedata
+from language_processors import grading
+from language_processors.features import available_features
+from language_processors.tagging import candidate, select_words
 
 logger = logging.getLogger(__name__)
 
 class SpanishProcessor:
-    def __init__(self):
+    def __init__(self, model_name: str = 'es_core_news_md'):
+        self.model_name = model_name
+        self.model_version = None
         self.nlp = None
         try:
             self.initialize_models()
@@ -16,17 +20,13 @@ class SpanishProcessor:
 
     def initialize_models(self):
         """Initialize spaCy model."""
-        self.nlp = spacy.load('es_core_news_md')
+        self.nlp = spacy.load(self.model_name)
+        self.model_version = f"{self.model_name}-{self.nlp.meta.get('version', '')}"
 
     def get_infinitive(self, token) -> str:
         """Get the infinitive form of a verb."""
         return token.lemma_
 
-    def remove_accents(self, text: str) -> str:
-        """Remove diacritics from text while preserving base characters."""
-        return ''.join(c for c in unicodedata.normalize('NFD', text)
-                      if unicodedata.category(c) != 'Mn')
-
     def get_tense_aspect_mood(self, token) -> Dict[str, str]:
         """Extract tense, aspect, and mood information from a token."""
         morph = token.morph
@@ -37,149 +37,97 @@ class SpanishProcessor:
             'VerbForm': morph.get('VerbForm', [''])[0]
         }
 
-    def analyze_text(self, text: str, features: List[str]) -> Dict[str, Any]:
-        """Analyze Spanish text for specific grammatical features."""
-        
+    def _word(self, token, feature: str, display: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            'original': token.text,
+            'display': token.lemma_ if display is None else display,
+            'position': token.idx,
+            'length': len(token.text),
+            'feature': feature
+        }
+
+    def tag_text(self, text: str) -> List[Dict[str, Any]]:
+        """Tag Spanish text for every feature at once (see language_processors.tagging).
+
+        Rules are listed in the order analyze_text tries them. The compound
+        tenses claim the verb whenever they are selected, even when the
+        construction is absent, so they are always listed.
+        """
         try:
             doc = self.nlp(text)
-            words_to_practice = []
+            candidates = []
 
             for i, token in enumerate(doc):
-                properties = self.get_tense_aspect_mood(token)
-                logger.debug(f"Token: {token.text}, Properties: {properties}")
-
                 # Skip non-verbs unless checking for specific constructions
                 if token.pos_ not in ['VERB', 'AUX']:
                     continue
 
-                detected_feature = None
+                properties = self.get_tense_aspect_mood(token)
+                logger.debug(f"Token: {token.text}, Properties: {properties}")
+                following = doc[i + 1] if i + 1 < len(doc) else None
+
+                def add(feature: str, words: List[Dict[str, Any]]):
+                    candidates.append(candidate(token.idx, feature, words))
 
                 # Simple Present
-                if ('simple_present' in features and 
-                    properties['Tense'] == 'Pres' and 
+                if (properties['Tense'] == 'Pres' and
                     properties['Mood'] == 'Ind' and
                     properties['VerbForm'] == 'Fin'):
-                    detected_feature = 'simple_present'
-                
-                # Present Continuous
-                elif 'present_continuous' in features:
-                    # Check for estar + gerund
-                    if (token.lemma_ == 'estar' and 
-                        i + 1 < len(doc) and 
-                        doc[i + 1].morph.get('VerbForm', [''])[0] == 'Ger'):
-                        # Only add the gerund part
-                        words_to_practice.append({
-                            'original': doc[i + 1].text,
-                            'display': doc[i + 1].lemma_,
-                            'position': doc[i + 1].idx,
-                            'length': len(doc[i + 1].text),
-                            'feature': 'present_continuous'
-                        })
-                        continue
-                
+                    add('simple_present', [self._word(token, 'simple_present', self.get_infinitive(token))])
+
+                # Present Continuous: estar + gerund, only the gerund is practised
+                if (token.lemma_ == 'estar' and following is not None and
+                    following.morph.get('VerbForm', [''])[0] == 'Ger'):
+                    add('present_continuous', [self._word(following, 'present_continuous')])
+                else:
+                    add('present_continuous', [])
+
                 # Imperfect
-                elif ('imperfect' in features and 
-                      properties['Tense'] == 'Imp' and 
-                      properties['Mood'] == 'Ind'):
-                    detected_feature = 'imperfect'
-                
+                if properties['Tense'] == 'Imp' and properties['Mood'] == 'Ind':
+                    add('imperfect', [self._word(token, 'imperfect', self.get_infinitive(token))])
+
                 # Preterite
-                elif ('preterite' in features and 
-                      properties['Tense'] == 'Past' and 
-                      properties['Aspect'] == 'Perf'):
-                    detected_feature = 'preterite'
-                
-                # Present Perfect
-                elif 'present_perfect' in features:
-                    if (token.lemma_ == 'haber' and 
-                        i + 1 < len(doc) and 
-                        doc[i + 1].morph.get('VerbForm', [''])[0] == 'Part'):
-                        words_to_practice.append({
-                            'original': token.text,
-                            'display': 'haber',
-                            'position': token.idx,
-                            'length': len(token.text),
-                            'feature': 'present_perfect_aux'
-                        })
-                        words_to_practice.append({
-                            'original': doc[i + 1].text,
-                            'display': doc[i + 1].lemma_,
-                            'position': doc[i + 1].idx,
-                            'length': len(doc[i + 1].text),
-                            'feature': 'present_perfect_main'
-                        })
-                        continue
-                
+                if properties['Tense'] == 'Past' and properties['Aspect'] == 'Perf':
+                    add('preterite', [self._word(token, 'preterite', self.get_infinitive(token))])
+
+                # Present Perfect: haber + participle
+                if (token.lemma_ == 'haber' and following is not None and
+                    following.morph.get('VerbForm', [''])[0] == 'Part'):
+                    add('present_perfect', [self._word(token, 'present_perfect_aux', 'haber'),
+                                            self._word(following, 'present_perfect_main')])
+                else:
+                    add('present_perfect', [])
+
                 # Simple Future
-                elif ('simple_future' in features and 
-                      properties['Tense'] == 'Fut'):
-                    detected_feature = 'simple_future'
-                
+                if properties['Tense'] == 'Fut':
+                    add('simple_future', [self._word(token, 'simple_future', self.get_infinitive(token))])
+
                 # Conditional
-                elif ('conditional' in features and 
-                      properties['Mood'] == 'Cnd'):
-                    detected_feature = 'conditional'
-                
+                if properties['Mood'] == 'Cnd':
+                    add('conditional', [self._word(token, 'conditional', self.get_infinitive(token))])
+
                 # Present Subjunctive
-                elif ('present_subjunctive' in features and 
-                      properties['Mood'] == 'Sub' and 
-                      properties['Tense'] == 'Pres'):
-                    detected_feature = 'present_subjunctive'
-
-                if detected_feature:
-                    words_to_practice.append({
-                        'original': token.text,
-                        'display': self.get_infinitive(token),
-                        'position': token.idx,
-                        'length': len(token.text),
-                        'feature': detected_feature
-                    })
-
-            return {
-                'text': text,
-                'words': words_to_practice
-            }
+                if properties['Mood'] == 'Sub' and properties['Tense'] == 'Pres':
+                    add('present_subjunctive',
+                        [self._word(token, 'present_subjunctive', self.get_infinitive(token))])
+
+            return candidates
 
         except Exception as e:
             logger.error(f"Error analyzing text: {e}")
             raise
 
+    def analyze_text(self, text: str, features: List[str]) -> Dict[str, Any]:
+        """Analyze Spanish text for specific grammatical features."""
+        return {
+            'text': text,
+            'words': select_words(self.tag_text(text), features)
+        }
+
     def check_answer(self, original: str, answer: str, feature: str) -> Dict[str, Any]:
         """Check if the answer matches the original conjugated form."""
-        try:
-            # Remove accents from both original and answer for comparison
-            original_clean = self.remove_accents(original.lower().strip())
-            answer_clean = self.remove_accents(answer.lower().strip())
-            
-            is_correct = original_clean == answer_clean
-            message = 'Correct!' if is_correct else f'Incorrect. The correct form is "{original}"'
-
-            # Add specific messages for different features
-            if not is_correct:
-                if feature == 'present_perfect_aux':
-                    message += ' (conjugated form of haber)'
-                elif feature == 'present_perfect_main':
-                    message += ' (past participle)'
-                elif feature == 'present_continuous':
-                    message += ' (gerund form)'
-
-            return {
-                'correct': is_correct,
-                'message': message
-            }
-        except Exception as e:
-            logger.error(f"Error checking answer: {e}")
-            raise
+        return grading.check_answer('spanish', original, answer, feature)
 
     def get_available_features(self) -> List[str]:
         """Return available grammatical features for Spanish."""
-        return [
-            'simple_present',
-            'present_continuous',
-            'imperfect',
-            'preterite',
-            'present_perfect',
-            'simple_future',
-            'conditional',
-            'present_subjunctive'
-        ]
\ No newline at end of file
+        return available_features('spanish')
\ No newline at end of file
@@ -0,0 +1,89 @@
+import logging
+import os
+import re
+import time
+from functools import partial
+from typing import List, Dict, Any, Callable
+
+from language_processors import grading
+from language_processors.features import FEATURES, available_features
+from language_processors.tagging import candidate, select_words
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r'\w+')
+
+
+class StubProcessor:
+    """Model-free stand-in for a language processor, used for load testing.
+
+    Analysis costs ``ms_per_kchar`` milliseconds per 1000 characters, spent
+    busy-waiting (holding the GIL like real inference) when ``cpu_bound`` is
+    set and sleeping otherwise. Every third word is tagged with one of the
+    language's features, whichever features are requested.
+    """
+
+    def __init__(self, language: str, ms_per_kchar: float = 50, cpu_bound: bool = True,
+                 model_name: str = 'stub'):
+        self.language = language
+        self.model_name = model_name
+        self.model_version = f"{model_name}-{language}"
+        self.ms_per_kchar = ms_per_kchar
+        self.cpu_bound = cpu_bound
+        self.initialize_models()
+
+    def initialize_models(self):
+        """Nothing to load."""
+        logger.info(f"Using stub processor for {self.language}")
+
+    def _simulate_inference(self, text: str):
+        seconds = len(text) / 1000 * self.ms_per_kchar / 1000
+        if not self.cpu_bound:
+            time.sleep(seconds)
+            return
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            pass
+
+    def tag_text(self, text: str) -> List[Dict[str, Any]]:
+        """Tag every third word with one of the language's features, in turn."""
+        self._simulate_inference(text)
+        features = FEATURES[self.language]
+        candidates = []
+        for i, match in enumerate(_WORD_RE.finditer(text)):
+            if i % 3:
+                continue
+            feature = features[(i // 3) % len(features)]
+            candidates.append(candidate(match.start(), feature, [{
+                'original': match.group(),
+                'display': match.group().lower(),
+                'position': match.start(),
+                'length': len(match.group()),
+                'feature': feature
+            }]))
+        return candidates
+
+    def analyze_text(self, text: str, features: List[str]) -> Dict[str, Any]:
+        """Report the tagged words whose feature was requested."""
+        return {
+            'text': text,
+            'words': select_words(self.tag_text(text), features)
+        }
+
+    def check_answer(self, original: str, answer: str, feature: str) -> Dict[str, Any]:
+        """Check the answer exactly like the real processors."""
+        return grading.check_answer(self.language, original, answer, feature)
+
+    def get_available_features(self) -> List[str]:
+        """Return the real processor's feature list."""
+        return available_features(self.language)
+
+
+def stub_processors() -> Dict[str, Callable[[], StubProcessor]]:
+    """Return stub processor factories for every language, configured from the environment."""
+    ms_per_kchar = float(os.environ.get('STUB_MS_PER_KCHAR', 50))
+    cpu_bound = os.environ.get('STUB_CPU_BOUND', '1') != '0'
+    return {
+        language: partial(StubProcessor, language, ms_per_kchar, cpu_bound)
+        for language in FEATURES
+    }
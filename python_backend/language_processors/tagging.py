@@ -0,0 +1,36 @@
+from typing import Any, Dict, Iterable, List
+
+# Feature-independent analysis results.
+#
+# A processor's tag_text(text) returns every rule that fires on each token as
+# a candidate {'slot', 'feature', 'words'}: slot is the offset of the token the
+# rule was evaluated on, feature the feature that enables the rule, and words
+# what the rule emits (possibly none, for rules that claim the token without
+# marking anything). A token's candidates are contiguous and in the order the
+# processor tries its rules. select_words() then reproduces analyze_text for
+# any feature subset, so tags can be cached once and reused for every request.
+
+
+def candidate(slot: int, feature: str, words: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {'slot': slot, 'feature': feature, 'words': words}
+
+
+def select_words(candidates: Iterable[Dict[str, Any]], features: List[str]) -> List[Dict[str, Any]]:
+    """Return the words analyze_text would report for features: per token, the first enabled rule."""
+    wanted = set(features)
+    words: List[Dict[str, Any]] = []
+    decided = None
+    for option in candidates:
+        if option['slot'] != decided and option['feature'] in wanted:
+            decided = option['slot']
+            words.extend(option['words'])
+    return words
+
+
+def shift_candidates(candidates: Iterable[Dict[str, Any]], offset: int) -> List[Dict[str, Any]]:
+    """Move candidates and their words by offset characters."""
+    return [
+        candidate(option['slot'] + offset, option['feature'],
+                  [dict(word, position=word['position'] + offset) for word in option['words']])
+        for option in candidates
+    ]
@@ -0,0 +1,23 @@
+# Sample corpus used to warm a freshly loaded processor before it takes traffic
+WARMUP_TEXTS = {
+    'russian': [
+        'Вчера мы ходили в театр с моими друзьями.',
+        'Студенты готовятся к экзамену в библиотеке, а преподаватель проверяет работы.',
+    ],
+    'spanish': [
+        'Ayer comimos en casa de mis abuelos y hablamos durante horas.',
+        'Estoy leyendo un libro que me recomendó mi profesora.',
+    ],
+    'french': [
+        'Hier, nous avons mangé chez mes grands-parents.',
+        'Je suis en train de lire un roman très intéressant.',
+    ],
+    'hebrew': [
+        'אתמול הלכנו לים עם החברים שלנו.',
+        'מחר נלך לשוק לקנות פירות.',
+    ],
+    'arabic': [
+        'ذهبنا أمس إلى البحر مع أصدقائنا.',
+        'سوف نسافر إلى القاهرة في الصيف.',
+    ],
+}
@@ -0,0 +1,286 @@
+import gc
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def current_rss_bytes() -> int:
+    """Return the resident set size of this process, or 0 if it cannot be read."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class _ModelSlot:
+    """Book-keeping for one language's processor."""
+
+    def __init__(self, language: str, factory: Callable[[], Any]):
+        self.language = language
+        self.factory = factory
+        self.processor = None
+        self.version = ''
+        self.footprint = 0
+        self.last_used = 0.0
+        self.in_flight = 0
+        self.loads = 0
+        self.evictions = 0
+        self.swaps = 0
+        self.load_lock = threading.Lock()
+
+
+class ModelManager:
+    """Loads language processors on demand and unloads them under a memory budget.
+
+    A language idle for longer than ``idle_ttl`` seconds is unloaded by the
+    sweeper. When loading a model would exceed ``memory_budget_mb``, idle
+    languages are unloaded least-recently-used first. Footprints are measured
+    as the RSS growth while a processor loads, so they are estimates.
+    """
+
+    def __init__(self, factories: Dict[str, Callable[[], Any]],
+                 memory_budget_mb: float = 0, idle_ttl: float = 0,
+                 sweep_interval: float = 60):
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.idle_ttl = idle_ttl
+        self.sweep_interval = sweep_interval
+        self._slots = {language: _ModelSlot(language, factory)
+                       for language, factory in factories.items()}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+
+    def __contains__(self, language: str) -> bool:
+        return language in self._slots
+
+    def version(self, language: str) -> str:
+        """Return the model version serving language ('' before its first load)."""
+        with self._lock:
+            return self._slots[language].version
+
+    def is_resident(self, language: str) -> bool:
+        """Return whether language's processor is currently loaded."""
+        with self._lock:
+            return self._slots[language].processor is not None
+
+    def languages(self) -> List[str]:
+        """Return all languages this manager can serve."""
+        return list(self._slots)
+
+    @contextmanager
+    def processor(self, language: str) -> Iterator[Any]:
+        """Yield the processor for language, loading it first if needed.
+
+        The processor is pinned for the duration of the block so the sweeper
+        never unloads a model that a request is still using.
+        """
+        slot = self._slots[language]
+        processor = self._acquire(slot)
+        try:
+            yield processor
+        finally:
+            with self._lock:
+                slot.in_flight -= 1
+                slot.last_used = time.monotonic()
+
+    def preload(self, languages: Optional[List[str]] = None):
+        """Load the given languages (default: all) ahead of the first request."""
+        for language in languages or self.languages():
+            with self.processor(language):
+                pass
+
+    def _acquire(self, slot: _ModelSlot) -> Any:
+        with self._lock:
+            if slot.processor is not None:
+                slot.in_flight += 1
+                slot.last_used = time.monotonic()
+                return slot.processor
+
+        with slot.load_lock:
+            with self._lock:
+                if slot.processor is not None:
+                    slot.in_flight += 1
+                    slot.last_used = time.monotonic()
+                    return slot.processor
+                evicted = self._make_room(slot.footprint, exclude=slot)
+            if evicted:
+                gc.collect()
+
+            self._load(slot)
+
+            with self._lock:
+                slot.in_flight += 1
+                slot.last_used = time.monotonic()
+                processor = slot.processor
+                evicted = self._make_room(0, exclude=slot)
+            if evicted:
+                gc.collect()
+            return processor
+
+    def _load(self, slot: _ModelSlot):
+        reload = slot.loads > 0
+        logger.info(f"{'Reloading' if reload else 'Loading'} {slot.language} processor")
+        started = time.monotonic()
+        rss_before = current_rss_bytes()
+        processor = slot.factory()
+        footprint = max(current_rss_bytes() - rss_before, 0)
+
+        with self._lock:
+            slot.processor = processor
+            slot.version = getattr(processor, 'model_version', '') or ''
+            # RSS growth is unreliable once freed pages are reused, so keep the
+            # largest footprint observed for this language.
+            slot.footprint = max(slot.footprint, footprint)
+            slot.loads += 1
+        logger.info(f"Loaded {slot.language} processor in {time.monotonic() - started:.1f}s "
+                    f"(~{footprint / 1024 / 1024:.0f} MB)")
+
+    def swap(self, language: str, factory: Callable[[], Any],
+             warmup_texts: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Replace language's processor without downtime.
+
+        The new processor is built and warmed on warmup_texts while the current
+        one keeps serving. The swap itself is a reference exchange under the
+        lock: requests already holding the old processor finish on it, and it
+        is freed once the last of them returns. If loading or warm-up fails,
+        the current processor stays in place and the error propagates.
+        """
+        slot = self._slots[language]
+        with slot.load_lock:
+            with self._lock:
+                evicted = self._make_room(slot.footprint, exclude=slot)
+                old_version = slot.version
+            if evicted:
+                gc.collect()
+
+            logger.info(f"Loading standby {language} processor")
+            started = time.monotonic()
+            rss_before = current_rss_bytes()
+            standby = factory()
+            footprint = max(current_rss_bytes() - rss_before, 0)
+            features = standby.get_available_features()
+            for text in warmup_texts or []:
+                standby.analyze_text(text, features)
+            new_version = getattr(standby, 'model_version', '') or ''
+
+            with self._lock:
+                slot.factory = factory
+                slot.processor = standby
+                slot.version = new_version
+                slot.footprint = footprint or slot.footprint
+                slot.last_used = time.monotonic()
+                slot.loads += 1
+                slot.swaps += 1
+            del standby
+
+        gc.collect()
+        logger.info(f"Swapped {language} processor {old_version or '(none)'} -> {new_version} "
+                    f"in {time.monotonic() - started:.1f}s")
+        return {'language': language, 'previous_version': old_version, 'version': new_version}
+
+    def _resident_bytes(self) -> int:
+        return sum(s.footprint for s in self._slots.values() if s.processor is not None)
+
+    def _make_room(self, needed: int, exclude: Optional[_ModelSlot] = None) -> List[str]:
+        """Unload idle languages, LRU first, until needed bytes fit the budget.
+
+        Must be called with self._lock held. Returns the unloaded languages.
+        """
+        evicted = []
+        if not self.memory_budget:
+            return evicted
+        candidates = sorted(
+            (s for s in self._slots.values()
+             if s.processor is not None and s.in_flight == 0 and s is not exclude),
+            key=lambda s: s.last_used
+        )
+        for slot in candidates:
+            if self._resident_bytes() + needed <= self.memory_budget:
+                break
+            self._unload(slot, reason='memory budget')
+            evicted.append(slot.language)
+        return evicted
+
+    def _unload(self, slot: _ModelSlot, reason: str):
+        """Drop the processor reference. Must be called with self._lock held."""
+        logger.info(f"Unloading {slot.language} processor ({reason})")
+        slot.processor = None
+        slot.evictions += 1
+
+    def unload(self, language: str) -> bool:
+        """Unload language now unless a request is using it."""
+        slot = self._slots[language]
+        with self._lock:
+            if slot.processor is None or slot.in_flight:
+                return False
+            self._unload(slot, reason='requested')
+        gc.collect()
+        return True
+
+    def sweep(self) -> List[str]:
+        """Unload languages idle for longer than idle_ttl, then enforce the budget."""
+        evicted = []
+        now = time.monotonic()
+        with self._lock:
+            for slot in self._slots.values():
+                if (self.idle_ttl and slot.processor is not None and slot.in_flight == 0
+                        and now - slot.last_used > self.idle_ttl):
+                    self._unload(slot, reason=f'idle for {now - slot.last_used:.0f}s')
+                    evicted.append(slot.language)
+            evicted.extend(self._make_room(0))
+        if evicted:
+            gc.collect()
+        return evicted
+
+    def start_sweeper(self):
+        """Run sweep() periodically in a daemon thread."""
+        if self._sweeper is not None or not (self.idle_ttl or self.memory_budget):
+            return
+
+        def run():
+            while not self._stop.wait(self.sweep_interval):
+                try:
+                    self.sweep()
+                except Exception as e:
+                    logger.error(f"Error sweeping models: {e}")
+
+        self._sweeper = threading.Thread(target=run, name='model-sweeper', daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return resident set, footprints and eviction/reload counters per language."""
+        now = time.monotonic()
+        with self._lock:
+            languages = {
+                slot.language: {
+                    'resident': slot.processor is not None,
+                    'version': slot.version,
+                    'footprint_mb': round(slot.footprint / 1024 / 1024, 1),
+                    'idle_seconds': round(now - slot.last_used, 1) if slot.loads else None,
+                    'in_flight': slot.in_flight,
+                    'loads': slot.loads,
+                    'reloads': max(slot.loads - 1 - slot.swaps, 0),
+                    'evictions': slot.evictions,
+                    'swaps': slot.swaps,
+                }
+                for slot in self._slots.values()
+            }
+            return {
+                'memory_budget_mb': round(self.memory_budget / 1024 / 1024, 1),
+                'idle_ttl_seconds': self.idle_ttl,
+                'resident_mb': round(self._resident_bytes() / 1024 / 1024, 1),
+                'process_rss_mb': round(current_rss_bytes() / 1024 / 1024, 1),
+                'resident': [lang for lang, s in languages.items() if s['resident']],
+                'languages': languages,
+            }
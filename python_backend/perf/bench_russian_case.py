@@ -0,0 +1,93 @@
+"""Benchmark: cost of spaCy + pymorphy3 case voting compared to spaCy alone.
+
+Needs ru_core_news_md and pymorphy3. Run from python_backend/:
+
+    python -m perf.bench_russian_case
+"""
+import time
+from typing import Any, Dict, List, Optional
+
+from language_processors.russian import RussianProcessor
+
+TEXT = (
+    'Вчера мы ходили в театр с моими друзьями. Я читаю книгу, которую мне '
+    'подарила сестра. Студенты готовятся к экзамену в библиотеке. Он написал '
+    'письмо своей бабушке в деревню. Мы долго гуляли по старому парку у реки. '
+) * 6
+
+FEATURES = ['nominative', 'genitive', 'dative', 'accusative', 'instrumental', 'prepositional']
+
+
+def spacy_case(processor: RussianProcessor, token) -> Optional[str]:
+    """The previous behaviour: read Case from spaCy and nothing else."""
+    case = token.morph.get('Case')
+    return processor.case_mapping.get(case[0].lower()) if case else None
+
+
+def analyze(processor: RussianProcessor, text: str, vote: bool) -> List[Dict[str, Any]]:
+    """RussianProcessor.analyze_text, taking the case from the vote or from spaCy alone.
+
+    Both variants do the same surrounding work (parsing, nominative forms,
+    result dicts), so the timing difference is the cost of the vote.
+    """
+    doc = processor.nlp_spacy(text)
+    pymorphy_scores = {}
+    if vote:
+        forms = {token.text.lower() for token in doc if processor.may_have_case(token)}
+        pymorphy_scores = {form: processor.get_pymorphy_case_scores(form) for form in forms}
+
+    words = []
+    for token in doc:
+        if not any(char.isalpha() for char in token.text):
+            continue
+        case = processor.get_case(token, pymorphy_scores) if vote else spacy_case(processor, token)
+        if case and case in FEATURES:
+            words.append({
+                'original': token.text,
+                'display': processor.get_nominative_form(token.text),
+                'position': token.idx,
+                'length': len(token.text),
+                'feature': case
+            })
+    return words
+
+
+def timed(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def main(repeat: int = 20):
+    processor = RussianProcessor()
+    doc = processor.nlp_spacy(TEXT)
+
+    # The ensemble variant must be exactly what the service runs
+    assert analyze(processor, TEXT, vote=True) == processor.analyze_text(TEXT, FEATURES)['words']
+
+    spacy_time = timed(lambda: analyze(processor, TEXT, vote=False), repeat)
+    processor.get_pymorphy_case_scores.cache_clear()
+    processor._parse.cache_clear()
+    cold_started = time.perf_counter()
+    analyze(processor, TEXT, vote=True)
+    cold_time = time.perf_counter() - cold_started
+    warm_time = timed(lambda: analyze(processor, TEXT, vote=True), repeat)
+
+    forms = {t.text.lower() for t in doc if processor.may_have_case(t)}
+    scores = {f: processor.get_pymorphy_case_scores(f) for f in forms}
+    tokens = [t for t in doc if processor.may_have_case(t)]
+    with_case = [t for t in tokens if scores[t.text.lower()]]
+    decided = sum(1 for t in with_case if len(scores[t.text.lower()]) == 1)
+
+    print(f"{len(TEXT)} chars, {len(tokens)} tokens that may carry case, {len(forms)} distinct forms")
+    print(f"spaCy only:             {spacy_time * 1000:8.1f} ms")
+    print(f"ensemble (cold cache):  {cold_time * 1000:8.1f} ms")
+    print(f"ensemble (warm cache):  {warm_time * 1000:8.1f} ms "
+          f"(+{(warm_time / spacy_time - 1) * 100:.0f}% over spaCy only)")
+    print(f"case-bearing tokens whose pymorphy3 paradigm allows exactly one case: "
+          f"{decided}/{len(with_case)} ({decided / len(with_case):.0%})")
+
+
+if __name__ == '__main__':
+    main()
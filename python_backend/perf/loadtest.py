@@ -0,0 +1,229 @@
+"""HTTP load generator for the Flask service in app.py.
+
+Runs a traffic scenario (perf/scenarios.py) at several concurrency levels
+and reports throughput and per-endpoint latency percentiles for each level.
+With --baseline, the run fails when throughput drops or p99 latency grows
+by more than --tolerance compared to the stored baseline.
+
+Run from python_backend/:
+
+    python -m perf.loadtest --stub                      # start a stub-model instance
+    python -m perf.loadtest --url http://localhost:5001 # use a running instance
+    python -m perf.loadtest --stub --update-baseline    # record a new baseline
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import ParseResult, urlparse
+
+from perf.scenarios import SCENARIOS, RequestGenerator
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'loadtest_baseline.json')
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_local_server(stub: bool, timeout: float = 300) -> Tuple[subprocess.Popen, str]:
+    """Start app.py on a free port and wait until it answers."""
+    port = _free_port()
+    env = dict(os.environ, PORT=str(port))
+    if stub:
+        env['STUB_MODELS'] = '1'
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen([sys.executable, 'app.py'], cwd=app_dir, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('app.py exited during start-up')
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/features/spanish')
+            if conn.getresponse().status == 200:
+                return process, url
+        except OSError:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError('app.py did not become ready in time')
+
+
+def _worker(base: ParseResult, generator: RequestGenerator, deadline: float,
+            measure_from: float, samples: List, lock: threading.Lock):
+    conn = http.client.HTTPConnection(base.hostname, base.port, timeout=60)
+    local = []
+    while time.monotonic() < deadline:
+        endpoint, method, path, body = generator.next()
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        started = time.monotonic()
+        try:
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            ok = response.status < 400
+        except (OSError, http.client.HTTPException):
+            ok = False
+            conn.close()
+            conn = http.client.HTTPConnection(base.hostname, base.port, timeout=60)
+        finished = time.monotonic()
+        if started >= measure_from:
+            local.append((endpoint, finished - started, ok))
+    conn.close()
+    with lock:
+        samples.extend(local)
+
+
+def run_level(url: str, scenario: Dict[str, Any], concurrency: int,
+              duration: float, warmup: float, seed: int) -> Dict[str, Any]:
+    """Drive the service with `concurrency` users and summarize the results."""
+    base = urlparse(url)
+    samples: List = []
+    lock = threading.Lock()
+    start = time.monotonic()
+    measure_from = start + warmup
+    deadline = measure_from + duration
+    threads = [
+        threading.Thread(target=_worker, args=(base, RequestGenerator(scenario, seed + i),
+                                               deadline, measure_from, samples, lock))
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latency = {}
+    for endpoint in sorted({s[0] for s in samples}) + ['all']:
+        values = sorted(s[1] for s in samples if endpoint in ('all', s[0]))
+        latency[endpoint] = {
+            'count': len(values),
+            'p50_ms': round(percentile(values, 0.50) * 1000, 2),
+            'p90_ms': round(percentile(values, 0.90) * 1000, 2),
+            'p99_ms': round(percentile(values, 0.99) * 1000, 2),
+            'max_ms': round((values[-1] if values else 0) * 1000, 2),
+        }
+    errors = sum(1 for s in samples if not s[2])
+    return {
+        'concurrency': concurrency,
+        'requests': len(samples),
+        'throughput_rps': round(len(samples) / duration, 2),
+        'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+        'latency': latency,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return a description of every regression against the baseline."""
+    regressions = []
+    previous = {level['concurrency']: level for level in baseline.get('levels', [])}
+    for level in report['levels']:
+        before = previous.get(level['concurrency'])
+        if before is None:
+            continue
+        c = level['concurrency']
+        if level['throughput_rps'] < before['throughput_rps'] * (1 - tolerance):
+            regressions.append(f"c={c}: throughput {level['throughput_rps']} rps "
+                               f"< baseline {before['throughput_rps']} rps")
+        if level['error_rate'] > before['error_rate'] + 0.01:
+            regressions.append(f"c={c}: error rate {level['error_rate']:.2%} "
+                               f"> baseline {before['error_rate']:.2%}")
+        for endpoint, stats in level['latency'].items():
+            old = before['latency'].get(endpoint)
+            if old and old['p99_ms'] and stats['p99_ms'] > old['p99_ms'] * (1 + tolerance):
+                regressions.append(f"c={c}: {endpoint} p99 {stats['p99_ms']} ms "
+                                   f"> baseline {old['p99_ms']} ms")
+    return regressions
+
+
+def print_report(report: Dict[str, Any]):
+    """Print the throughput-vs-concurrency and latency-percentile curves."""
+    print(f"scenario={report['scenario']} duration={report['duration']}s")
+    print(f"{'users':>6}{'rps':>10}{'errors':>9}  "
+          f"{'endpoint':<9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for level in report['levels']:
+        first = True
+        for endpoint, stats in level['latency'].items():
+            prefix = (f"{level['concurrency']:>6}{level['throughput_rps']:>10.1f}"
+                      f"{level['error_rate']:>9.2%}  ") if first else ' ' * 27
+            print(f"{prefix}{endpoint:<9}{stats['p50_ms']:>9.1f}{stats['p90_ms']:>9.1f}"
+                  f"{stats['p99_ms']:>9.1f}{stats['max_ms']:>9.1f}")
+            first = False
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='base URL of a running instance (default: start one)')
+    parser.add_argument('--stub', action='store_true', help='start the instance with stub models')
+    parser.add_argument('--scenario', default='default', choices=sorted(SCENARIOS))
+    parser.add_argument('--levels', default='1,8,64,256', help='comma-separated concurrency levels')
+    parser.add_argument('--duration', type=float, default=20, help='seconds measured per level')
+    parser.add_argument('--warmup', type=float, default=3, help='unmeasured seconds per level')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write the JSON report here')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='allowed relative throughput drop / p99 growth')
+    args = parser.parse_args(argv)
+
+    process = None
+    url = args.url
+    if not url:
+        process, url = start_local_server(args.stub)
+    try:
+        scenario = SCENARIOS[args.scenario]
+        levels = [run_level(url, scenario, int(c), args.duration, args.warmup, args.seed)
+                  for c in args.levels.split(',')]
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    report = {'scenario': args.scenario, 'duration': args.duration,
+              'stub_models': bool(args.stub), 'levels': levels}
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if (baseline.get('scenario'), baseline.get('stub_models')) != (args.scenario, bool(args.stub)):
+            print('Baseline was recorded with a different scenario or model mode, skipping comparison')
+            return 0
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
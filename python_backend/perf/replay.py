@@ -0,0 +1,252 @@
+"""Replay a recorded traffic trace against the Flask service in app.py.
+
+Reads a trace written with TRAFFIC_RECORD_PATH (including its rotated
+backups), re-issues the requests at the recorded pace or faster, and
+compares per-endpoint latency percentiles and response digests with the
+recording. Latencies are the app's own (Server-Timing header, as in the
+trace) so connection overhead does not skew the comparison. Requests whose text was not sampled are replayed with
+synthetic text of the same length, so they reproduce the load but not
+the output; digests are only compared for requests replayed verbatim.
+Digests only match when the replay target runs the same models (stub or
+real, same versions) as the recorded instance.
+
+Run from python_backend/:
+
+    python -m perf.replay traffic.jsonl --stub               # recorded pace
+    python -m perf.replay traffic.jsonl --stub --speed 10    # 10x faster
+    python -m perf.replay traffic.jsonl --url http://localhost:5001 --speed 0
+"""
+import argparse
+import glob
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from perf.loadtest import percentile, start_local_server
+from perf.scenarios import SAMPLE_SENTENCES
+from traffic import TEXT_FIELDS, digest
+
+
+def trace_files(path: str) -> List[str]:
+    """Return the trace and its rotated backups, oldest first."""
+    backups = sorted(glob.glob(f'{glob.escape(path)}.[0-9]*'),
+                     key=lambda name: int(name.rsplit('.', 1)[1]), reverse=True)
+    return backups + [path]
+
+
+def read_trace(path: str) -> List[Dict[str, Any]]:
+    entries = []
+    for name in trace_files(path):
+        with open(name, encoding='utf-8') as f:
+            entries.extend(json.loads(line) for line in f if line.strip())
+    entries.sort(key=lambda entry: entry['ts'])
+    return entries
+
+
+def synthesize(language: str, recorded: Dict[str, Any]) -> str:
+    """Deterministic stand-in text with the recorded length, seeded by the recorded hash."""
+    rng = random.Random(recorded['hash'])
+    sentences = SAMPLE_SENTENCES.get(language) or SAMPLE_SENTENCES['spanish']
+    parts = []
+    size = 0
+    while size < recorded['length']:
+        parts.append(rng.choice(sentences))
+        size += len(parts[-1]) + 1
+    return ' '.join(parts)[:recorded['length']]
+
+
+def server_time(response: http.client.HTTPResponse) -> Optional[float]:
+    """Seconds the app spent on the request, from its Server-Timing header."""
+    for metric in (response.getheader('Server-Timing') or '').split(','):
+        name, _, params = metric.strip().partition(';')
+        if name == 'app' and params.startswith('dur='):
+            return float(params[4:]) / 1000
+    return None
+
+
+def build_request(entry: Dict[str, Any]) -> Tuple[str, str, Optional[Dict[str, Any]], bool]:
+    """Return (method, path, body, verbatim) that reproduces a trace entry."""
+    language = entry['language']
+    if entry['endpoint'] == 'features':
+        return 'GET', f'/features/{language}', None, True
+
+    def text(recorded: Dict[str, Any]) -> str:
+        return recorded['value'] if 'value' in recorded else synthesize(language, recorded)
+
+    body: Dict[str, Any] = {}
+    for field in ('features', 'feature'):
+        if field in entry:
+            body[field] = entry[field]
+    for field in TEXT_FIELDS:
+        if field in entry:
+            body[field] = text(entry[field])
+    if 'prefetch' in entry:
+        body['prefetch'] = [text(recorded) for recorded in entry['prefetch']]
+    verbatim = entry.get('sampled', True)
+    return 'POST', f"/{entry['endpoint']}/{language}", body, verbatim
+
+
+def replay(url: str, entries: List[Dict[str, Any]], speed: float,
+           max_inflight: int) -> List[Dict[str, Any]]:
+    """Issue every entry, keeping the recorded gaps divided by speed (0: no pacing)."""
+    base = urlparse(url)
+    local = threading.local()
+
+    def send(method: str, path: str, body: Optional[Dict[str, Any]]) -> Tuple[int, bytes, float]:
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        for _ in range(2):
+            conn = getattr(local, 'conn', None)
+            if conn is None:
+                conn = local.conn = http.client.HTTPConnection(base.hostname, base.port, timeout=60)
+            started = time.monotonic()
+            try:
+                conn.request(method, path, body=payload, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+                elapsed = time.monotonic() - started
+                return response.status, data, server_time(response) or elapsed
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                local.conn = None
+        return 0, b'', time.monotonic() - started
+
+    results: List[Dict[str, Any]] = [{} for _ in entries]
+
+    def run(index: int, method: str, path: str, body: Optional[Dict[str, Any]], verbatim: bool):
+        status, data, elapsed = send(method, path, body)
+        results[index] = {'status': status, 'duration_ms': elapsed * 1000,
+                          'digest': digest(data), 'verbatim': verbatim}
+
+    first_ts = entries[0]['ts'] if entries else 0
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max_inflight) as pool:
+        for index, entry in enumerate(entries):
+            if speed > 0:
+                delay = started + (entry['ts'] - first_ts) / speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            pool.submit(run, index, *build_request(entry))
+    return results
+
+
+def summarize(entries: List[Dict[str, Any]], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Per-endpoint latency percentiles, recorded vs replayed, and digest checks."""
+    latency = {}
+    for endpoint in sorted({entry['endpoint'] for entry in entries}):
+        pairs = [(entry, result) for entry, result in zip(entries, results)
+                 if entry['endpoint'] == endpoint]
+        recorded = sorted(entry['duration_ms'] for entry, _ in pairs)
+        replayed = sorted(result['duration_ms'] for _, result in pairs)
+        latency[endpoint] = {
+            'count': len(pairs),
+            **{f'recorded_{name}_ms': round(percentile(recorded, fraction), 2)
+               for name, fraction in (('p50', 0.50), ('p90', 0.90), ('p99', 0.99))},
+            **{f'replayed_{name}_ms': round(percentile(replayed, fraction), 2)
+               for name, fraction in (('p50', 0.50), ('p90', 0.90), ('p99', 0.99))},
+        }
+
+    compared = 0
+    mismatches = []
+    status_changes = 0
+    for index, (entry, result) in enumerate(zip(entries, results)):
+        if result['status'] != entry['status']:
+            status_changes += 1
+            continue
+        if not result['verbatim']:
+            continue
+        compared += 1
+        if result['digest'] != entry['result_digest']:
+            mismatches.append({'index': index, 'endpoint': entry['endpoint'],
+                               'language': entry['language'], 'status': entry['status']})
+    return {
+        'requests': len(entries),
+        'verbatim': sum(1 for result in results if result['verbatim']),
+        'status_changes': status_changes,
+        'digests_compared': compared,
+        'digest_mismatches': mismatches,
+        'latency': latency,
+    }
+
+
+def regressions(report: Dict[str, Any], tolerance: float, slack_ms: float = 1.0) -> List[str]:
+    """Describe output changes and p99 latencies above the recorded ones.
+
+    Growth under slack_ms is ignored; sub-millisecond endpoints are mostly noise.
+    """
+    problems = [f"{m['endpoint']}/{m['language']} request #{m['index']}: response differs from recording"
+                for m in report['digest_mismatches']]
+    for endpoint, stats in report['latency'].items():
+        limit = max(stats['recorded_p99_ms'] * (1 + tolerance), stats['recorded_p99_ms'] + slack_ms)
+        if stats['replayed_p99_ms'] > limit:
+            problems.append(f"{endpoint} p99 {stats['replayed_p99_ms']} ms "
+                            f"> recorded {stats['recorded_p99_ms']} ms")
+    return problems
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"requests={report['requests']} verbatim={report['verbatim']} "
+          f"status_changes={report['status_changes']} "
+          f"digests={report['digests_compared'] - len(report['digest_mismatches'])}"
+          f"/{report['digests_compared']} match")
+    print(f"{'endpoint':<9}{'count':>7}  {'p50 rec/rep ms':>16}{'p90 rec/rep ms':>16}{'p99 rec/rep ms':>16}")
+    for endpoint, stats in report['latency'].items():
+        columns = ''.join(f"{stats[f'recorded_{p}_ms']:>8.1f}/{stats[f'replayed_{p}_ms']:<7.1f}"
+                          for p in ('p50', 'p90', 'p99'))
+        print(f"{endpoint:<9}{stats['count']:>7}  {columns}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('trace', help='trace file written with TRAFFIC_RECORD_PATH')
+    parser.add_argument('--url', help='base URL of a running instance (default: start one)')
+    parser.add_argument('--stub', action='store_true', help='start the instance with stub models')
+    parser.add_argument('--speed', type=float, default=1,
+                        help='pace relative to the recording; 0 sends as fast as --max-inflight allows')
+    parser.add_argument('--max-inflight', type=int, default=64, help='concurrent requests at most')
+    parser.add_argument('--skip-unsampled', action='store_true',
+                        help='only replay requests whose text was recorded verbatim')
+    parser.add_argument('--output', help='write the JSON report here')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='allowed relative p99 growth over the recording')
+    args = parser.parse_args(argv)
+
+    entries = read_trace(args.trace)
+    if args.skip_unsampled:
+        entries = [entry for entry in entries if entry.get('sampled', True)]
+    if not entries:
+        print('Trace is empty, nothing to replay')
+        return 0
+
+    process = None
+    url = args.url
+    if not url:
+        process, url = start_local_server(args.stub)
+    try:
+        results = replay(url, entries, args.speed, args.max_inflight)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    report = summarize(entries, results)
+    report.update({'trace': args.trace, 'speed': args.speed, 'stub_models': bool(args.stub)})
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    problems = regressions(report, args.tolerance)
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
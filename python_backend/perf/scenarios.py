@@ -0,0 +1,163 @@
+"""Traffic scenarios for perf/loadtest.py.
+
+Chunk sizes follow Text.chunkContent in backend/models/Text.js: every chunk
+of a text is CHUNK_SIZE characters except the last, which holds the
+remainder, and chunks are cut without regard to word boundaries.
+"""
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+CHUNK_SIZE = 1000
+
+SAMPLE_SENTENCES = {
+    'spanish': [
+        'Ayer comimos en casa de mis abuelos y hablamos durante horas.',
+        'Estoy leyendo un libro que me recomendó mi profesora.',
+        'Cuando era niño, jugaba al fútbol todos los sábados.',
+        'Si tuviera más tiempo, viajaría por toda Sudamérica.',
+        'Mañana iremos al mercado para comprar fruta fresca.',
+    ],
+    'french': [
+        'Hier, nous avons mangé chez mes grands-parents.',
+        'Je suis en train de lire un roman très intéressant.',
+        'Quand il était petit, il allait à la plage chaque été.',
+        'Il faut que tu viennes avec nous demain soir.',
+        'Nous partirons en vacances dès que possible.',
+    ],
+    'russian': [
+        'Вчера мы ходили в театр с моими друзьями.',
+        'Я читаю книгу, которую мне подарила сестра.',
+        'Студенты готовятся к экзамену в библиотеке.',
+        'Он написал письмо своей бабушке в деревню.',
+        'Мы долго гуляли по старому парку у реки.',
+    ],
+    'hebrew': [
+        'אתמול הלכנו לים עם החברים שלנו.',
+        'אני כותב מכתב לסבתא שלי.',
+        'מחר נלך לשוק לקנות פירות.',
+        'הילדים שיחקו בגן כל אחר הצהריים.',
+        'היא לומדת באוניברסיטה בירושלים.',
+    ],
+    'arabic': [
+        'ذهبنا أمس إلى البحر مع أصدقائنا.',
+        'يكتب الطالب الدرس في الدفتر.',
+        'سوف نسافر إلى القاهرة في الصيف.',
+        'قرأت المعلمتان الكتابين الجديدين.',
+        'يلعب الأطفال في الحديقة كل يوم.',
+    ],
+}
+
+FEATURES = {
+    'spanish': ['simple_present', 'preterite', 'imperfect', 'present_continuous', 'conditional'],
+    'french': ['present_simple', 'passe_compose', 'imparfait', 'future_simple'],
+    'russian': ['nominative', 'genitive', 'accusative', 'instrumental', 'prepositional'],
+    'hebrew': ['past', 'present', 'future'],
+    'arabic': ['past', 'present', 'future', 'plural'],
+}
+
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    # A reading session: one analyze per page, then many answer checks.
+    'default': {
+        'endpoint_mix': {'check': 0.75, 'analyze': 0.15, 'features': 0.10},
+        'language_mix': {'spanish': 0.35, 'french': 0.25, 'russian': 0.20,
+                         'hebrew': 0.10, 'arabic': 0.10},
+        'text_chunks': (1, 12),
+        'features_per_request': (1, 3),
+        'popular_text_ratio': 0.3,
+        'correct_answer_ratio': 0.6,
+    },
+    # Many users starting new texts at once.
+    'analyze_heavy': {
+        'endpoint_mix': {'check': 0.40, 'analyze': 0.50, 'features': 0.10},
+        'language_mix': {'spanish': 0.35, 'french': 0.25, 'russian': 0.20,
+                         'hebrew': 0.10, 'arabic': 0.10},
+        'text_chunks': (1, 12),
+        'features_per_request': (1, 3),
+        'popular_text_ratio': 0.1,
+        'correct_answer_ratio': 0.6,
+    },
+}
+
+
+def _weighted(rng: random.Random, weights: Dict[str, float]) -> str:
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+class RequestGenerator:
+    """Produces a deterministic stream of (endpoint, method, path, body) requests.
+
+    Analyze requests come from texts read page by page, and each carries the
+    same hints TextPage sends: the next chunks to prefetch and the
+    neighbouring chunks as context.
+    """
+
+    # Chunks after the current one sent as the prefetch hint (see textRoutes.js)
+    PREFETCH_CHUNKS = 3
+
+    def __init__(self, scenario: Dict[str, Any], seed: int):
+        self.scenario = scenario
+        self.rng = random.Random(seed)
+        # A small shared pool of "popular" texts, identical across generators.
+        pool_rng = random.Random(0)
+        self.popular = {
+            language: [self._text(pool_rng, language) for _ in range(8)]
+            for language in SAMPLE_SENTENCES
+        }
+        # The text being read: (language, chunks, next page, features)
+        self.reading: Optional[Tuple[str, List[str], int, List[str]]] = None
+
+    def _text(self, rng: random.Random, language: str) -> List[str]:
+        """Build a text's chunks the way Text.chunkContent would cut it."""
+        low, high = self.scenario['text_chunks']
+        total_chunks = rng.randint(low, high)
+        length = (total_chunks - 1) * CHUNK_SIZE + rng.randint(1, CHUNK_SIZE)
+
+        offset = rng.randrange(CHUNK_SIZE)
+        parts: List[str] = []
+        size = 0
+        while size < offset + length:
+            sentence = rng.choice(SAMPLE_SENTENCES[language])
+            parts.append(sentence)
+            size += len(sentence) + 1
+        content = ' '.join(parts)[offset:offset + length]
+        return [content[start:start + CHUNK_SIZE] for start in range(0, length, CHUNK_SIZE)]
+
+    def _analyze(self, rng: random.Random) -> Tuple[str, str, str, Any]:
+        if self.reading is None:
+            language = _weighted(rng, self.scenario['language_mix'])
+            if rng.random() < self.scenario['popular_text_ratio']:
+                chunks = rng.choice(self.popular[language])
+            else:
+                chunks = self._text(rng, language)
+            low, high = self.scenario['features_per_request']
+            count = min(rng.randint(low, high), len(FEATURES[language]))
+            self.reading = (language, chunks, 0, rng.sample(FEATURES[language], count))
+
+        language, chunks, page, features = self.reading
+        self.reading = (language, chunks, page + 1, features) if page + 1 < len(chunks) else None
+        upcoming = chunks[page + 1:page + 1 + self.PREFETCH_CHUNKS]
+        body = {
+            'text': chunks[page],
+            'features': features,
+            'prefetch': upcoming,
+            'context_before': chunks[page - 1] if page > 0 else '',
+            'context_after': upcoming[0] if upcoming else '',
+        }
+        return 'analyze', 'POST', f'/analyze/{language}', body
+
+    def next(self) -> Tuple[str, str, str, Any]:
+        rng = self.rng
+        endpoint = _weighted(rng, self.scenario['endpoint_mix'])
+        if endpoint == 'analyze':
+            return self._analyze(rng)
+
+        language = _weighted(rng, self.scenario['language_mix'])
+        if endpoint == 'features':
+            return endpoint, 'GET', f'/features/{language}', None
+
+        original = rng.choice(rng.choice(SAMPLE_SENTENCES[language]).split()).strip('.,')
+        correct = rng.random() < self.scenario['correct_answer_ratio']
+        answer = original if correct else original[::-1]
+        body = {'original': original, 'answer': answer,
+                'feature': rng.choice(FEATURES[language])}
+        return endpoint, 'POST', f'/check/{language}', body
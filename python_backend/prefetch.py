@@ -0,0 +1,193 @@
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from analysis_cache import AnalysisCache
+from language_processors.normalization import cache_key
+from segmentation import context_key_text
+
+logger = logging.getLogger(__name__)
+
+
+class _PrefetchJob:
+    """A queued speculative analysis of one upcoming chunk."""
+
+    def __init__(self, key: str, language: str, text: str, features: List[str], depth: int,
+                 context_before: str = '', context_after: str = ''):
+        self.key = key
+        self.language = language
+        self.text = text
+        self.context_before = context_before
+        self.context_after = context_after
+        self.features = features
+        self.depth = depth
+        self.submitted = time.monotonic()
+        self.cancelled = False
+        self.started = False
+        self.done = threading.Event()
+
+
+class Prefetcher:
+    """Speculatively analyzes the chunks that follow a requested chunk.
+
+    Jobs run on a background worker at low priority: a job only starts while
+    at most ``max_foreground`` interactive analyses are running, jobs
+    nearer the current chunk run first, and jobs still waiting after
+    ``max_age`` seconds are dropped. Results go into the shared analysis
+    cache, so the follow-up "load more" request becomes a cache hit.
+    """
+
+    def __init__(self, analyze: Callable[[str, str, List[str], str, str], Optional[Dict[str, Any]]],
+                 cache: AnalysisCache, depth: int = 2, max_queue: int = 64,
+                 max_foreground: int = 0, max_age: float = 30, workers: int = 1):
+        self.analyze = analyze
+        self.cache = cache
+        self.depth = depth
+        self.max_foreground = max_foreground
+        self.max_age = max_age
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue(maxsize=max_queue)
+        self._order = itertools.count()
+        self._jobs: Dict[str, _PrefetchJob] = {}
+        self._prefetched: "OrderedDict[str, None]" = OrderedDict()
+        self._max_tracked = max(cache.max_entries, 1)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._foreground = 0
+        self._counters = {
+            'submitted': 0, 'completed': 0, 'hits': 0, 'joined': 0,
+            'dropped': 0, 'cancelled': 0, 'expired': 0, 'failed': 0,
+        }
+        self._workers = [
+            threading.Thread(target=self._run, name=f'prefetch-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    @contextmanager
+    def foreground(self) -> Iterator[None]:
+        """Mark an interactive analysis as running so prefetch yields to it."""
+        with self._lock:
+            self._foreground += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._foreground -= 1
+                self._idle.notify_all()
+
+    def submit(self, language: str, chunks: List[Tuple[str, str, str]], features: List[str],
+               version: str = ''):
+        """Queue the upcoming chunks of a text, nearest first.
+
+        Each chunk is a (context_before, text, context_after) triple, already
+        stitched the way the follow-up request will stitch it, so that the
+        cache keys match.
+        """
+        for depth, (context_before, text, context_after) in enumerate(chunks[:self.depth], start=1):
+            if not text:
+                continue
+            key = cache_key(language, context_key_text(context_before, text, context_after),
+                            features, version)
+            with self._lock:
+                if key in self._jobs or key in self.cache:
+                    continue
+                job = _PrefetchJob(key, language, text, list(features), depth,
+                                   context_before, context_after)
+                try:
+                    self._queue.put_nowait((depth, next(self._order), job))
+                except queue.Full:
+                    self._counters['dropped'] += 1
+                    continue
+                self._jobs[key] = job
+                self._counters['submitted'] += 1
+
+    def record_hit(self, key: str):
+        """Count a cache hit on key as a prefetch hit if prefetch produced it."""
+        with self._lock:
+            if key in self._prefetched:
+                del self._prefetched[key]
+                self._counters['hits'] += 1
+
+    def claim(self, key: str, timeout: float = 0) -> Optional[Dict[str, Any]]:
+        """Handle a foreground cache miss for key.
+
+        A job that is still queued is cancelled, since the caller will run the
+        analysis itself. A job that is already running is waited on for up to
+        timeout seconds and its result returned, so the work is not repeated.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                return None
+            if not job.started:
+                job.cancelled = True
+                self._jobs.pop(key, None)
+                self._counters['cancelled'] += 1
+                return None
+
+        if timeout and job.done.wait(timeout):
+            result = self.cache.get(key)
+            if result is not None:
+                with self._lock:
+                    self._prefetched.pop(key, None)
+                    self._counters['joined'] += 1
+            return result
+        return None
+
+    def _run(self):
+        while True:
+            _, _, job = self._queue.get()
+            try:
+                self._process(job)
+            except Exception as e:
+                logger.error(f"Error prefetching {job.language} chunk: {e}")
+                with self._lock:
+                    self._counters['failed'] += 1
+            finally:
+                with self._lock:
+                    if self._jobs.get(job.key) is job:
+                        del self._jobs[job.key]
+                job.done.set()
+                self._queue.task_done()
+
+    def _process(self, job: _PrefetchJob):
+        with self._lock:
+            # Yield to interactive traffic; give up on jobs that waited too long.
+            while not job.cancelled and self._foreground > self.max_foreground:
+                remaining = self.max_age - (time.monotonic() - job.submitted)
+                if remaining <= 0:
+                    break
+                self._idle.wait(remaining)
+            if job.cancelled:
+                return
+            if time.monotonic() - job.submitted > self.max_age:
+                self._counters['expired'] += 1
+                return
+            job.started = True
+
+        result = self.analyze(job.language, job.text, job.features,
+                              job.context_before, job.context_after)
+        if result is None:
+            return
+        with self._lock:
+            self._prefetched[job.key] = None
+            while len(self._prefetched) > self._max_tracked:
+                self._prefetched.popitem(last=False)
+            self._counters['completed'] += 1
+        self.cache.put(job.key, result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return prefetch counters and the prefetch hit rate."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['queued'] = self._queue.qsize()
+            stats['foreground'] = self._foreground
+            useful = stats['hits'] + stats['joined']
+            stats['hit_rate'] = useful / stats['completed'] if stats['completed'] else 0.0
+            return stats
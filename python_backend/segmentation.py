@@ -0,0 +1,127 @@
+import re
+from typing import Any, Callable, Dict, List, Tuple
+
+# A sentence ends at terminal punctuation (Latin, Arabic, ellipsis), optionally
+# followed by closing quotes/brackets, and then whitespace; or at a blank line.
+_SENTENCE_END_RE = re.compile(r'[.!?…؟۔]+[\'"»”’)\]]*(?=\s|$)\s*|\n\s*\n\s*')
+_WHITESPACE_RE = re.compile(r'\s')
+
+
+def split_sentences(text: str) -> List[Tuple[int, int]]:
+    """Split text into contiguous (start, end) sentence spans covering all of it.
+
+    Trailing whitespace stays with the sentence it follows, so
+    text[start:end] for consecutive spans concatenates back to text.
+    """
+    spans = []
+    start = 0
+    for match in _SENTENCE_END_RE.finditer(text):
+        end = match.end()
+        if end > start:
+            spans.append((start, end))
+            start = end
+    if start < len(text):
+        spans.append((start, len(text)))
+    return spans
+
+
+def _cut_at_whitespace(text: str, start: int, limit: int) -> int:
+    """Return the largest cut in (start, limit] that does not split a word."""
+    for i in range(limit, start, -1):
+        if _WHITESPACE_RE.match(text, i - 1):
+            return i
+    return limit
+
+
+def chunk_boundaries(text: str, max_chars: int = 1000) -> List[Tuple[int, int]]:
+    """Pack whole sentences into chunks of at most max_chars characters.
+
+    A sentence longer than max_chars is cut at the last whitespace before
+    the limit, and only mid-word when it contains none.
+    """
+    chunks = []
+    chunk_start = 0
+    chunk_end = 0
+    for start, end in split_sentences(text):
+        if end - chunk_start <= max_chars:
+            chunk_end = end
+            continue
+        if chunk_end > chunk_start:
+            chunks.append((chunk_start, chunk_end))
+            chunk_start = chunk_end
+        while end - chunk_start > max_chars:
+            cut = _cut_at_whitespace(text, chunk_start, chunk_start + max_chars)
+            chunks.append((chunk_start, cut))
+            chunk_start = cut
+        chunk_end = end
+    if chunk_end > chunk_start:
+        chunks.append((chunk_start, chunk_end))
+    return chunks
+
+
+def _ends_sentence(text: str) -> bool:
+    match = None
+    for match in _SENTENCE_END_RE.finditer(text):
+        pass
+    return match is not None and match.end() == len(text)
+
+
+def stitch_context(text: str, context_before: str, context_after: str,
+                   max_chars: int = 300) -> Tuple[str, str]:
+    """Trim neighbouring chunks down to the sentence fragments that cross into text.
+
+    Returns the unfinished sentence at the end of context_before and the
+    rest of the sentence that text leaves unfinished, each capped at
+    max_chars and never starting or ending mid-word because of the cap.
+    """
+    before = ''
+    if context_before and not _ends_sentence(context_before):
+        start = 0
+        for match in _SENTENCE_END_RE.finditer(context_before):
+            start = match.end()
+        if start < len(context_before) - max_chars:
+            cut = _WHITESPACE_RE.search(context_before, len(context_before) - max_chars)
+            start = cut.end() if cut else len(context_before)
+        before = context_before[start:]
+
+    after = ''
+    if context_after and not _ends_sentence(text):
+        spans = split_sentences(context_after)
+        end = spans[0][1] if spans else 0
+        if end > max_chars:
+            end = _cut_at_whitespace(context_after, 0, max_chars)
+        after = context_after[:end]
+    return before, after
+
+
+def context_key_text(context_before: str, text: str, context_after: str) -> str:
+    """Text to hash into the cache key of an analysis with (stitched) context."""
+    if not context_before and not context_after:
+        return text
+    return '\x1f'.join((context_before, text, context_after))
+
+
+def analyze_with_context(analyze: Callable[[str, List[str]], Dict[str, Any]], text: str,
+                         features: List[str], context_before: str = '',
+                         context_after: str = '') -> Dict[str, Any]:
+    """Analyze text together with the sentence fragments around it.
+
+    Words are kept only if they start inside text, with positions relative
+    to text. Neighbouring chunks analyzed the same way therefore report
+    every word exactly once, and words at the edges are tagged with their
+    full sentence in view.
+    """
+    if not context_before and not context_after:
+        return analyze(text, features)
+
+    offset = len(context_before)
+    result = analyze(context_before + text + context_after, features)
+    words = [
+        dict(word, position=word['position'] - offset)
+        for word in result['words']
+        if offset <= word['position'] < offset + len(text)
+    ]
+    return {
+        'text': text,
+        'words': words
+    }
@@ -0,0 +1,144 @@
+import json
+import logging
+import os
+from bisect import bisect_right
+from typing import Any, Callable, Dict, List, Tuple
+
+from analysis_cache import AnalysisCache
+from language_processors.normalization import cache_key
+from language_processors.tagging import candidate, select_words, shift_candidates
+from segmentation import split_sentences
+
+logger = logging.getLogger(__name__)
+
+# Joins unseen sentences into one model call; a blank line keeps them separate sentences
+BATCH_SEPARATOR = '\n\n'
+# Largest batch sent to the model in one call
+BATCH_MAX_CHARS = 10000
+
+
+def sentence_key(language: str, version: str, sentence: str) -> str:
+    """Memo key of a sentence's tags; tags cover every feature, so none are in the key."""
+    return cache_key(language, sentence, [], version)
+
+
+def tag_batch(tag: Callable[[str], List[Dict[str, Any]]],
+              sentences: List[str]) -> List[List[Dict[str, Any]]]:
+    """Tag sentences in one model call and split the candidates back per sentence.
+
+    Relies on the processor reporting exact character offsets in 'slot' and
+    'position'.
+    """
+    starts = []
+    position = 0
+    for sentence in sentences:
+        starts.append(position)
+        position += len(sentence) + len(BATCH_SEPARATOR)
+
+    per_sentence: List[List[Dict[str, Any]]] = [[] for _ in sentences]
+    for option in tag(BATCH_SEPARATOR.join(sentences)):
+        index = bisect_right(starts, option['slot']) - 1
+        start, end = starts[index], starts[index] + len(sentences[index])
+        if not start <= option['slot'] < end:
+            continue
+        words = [word for word in option['words'] if start <= word['position'] < end]
+        per_sentence[index].extend(shift_candidates([candidate(option['slot'], option['feature'], words)],
+                                                    -start))
+    return per_sentence
+
+
+def sentence_cores(text: str) -> List[Tuple[int, str]]:
+    """Return (start, sentence) for each whitespace-trimmed, non-empty sentence of text."""
+    cores = []
+    for start, end in split_sentences(text):
+        sentence = text[start:end]
+        core = sentence.strip()
+        if core:
+            cores.append((start + len(sentence) - len(sentence.lstrip()), core))
+    return cores
+
+
+def analyze_by_sentence(tag: Callable[[str], List[Dict[str, Any]]], memo: AnalysisCache,
+                        language: str, version: str, text: str, features: List[str]) -> Dict[str, Any]:
+    """Analyze text sentence by sentence, reusing tags for sentences seen before.
+
+    Sentences are keyed by their whitespace-trimmed content, language and
+    model version. The memo holds each sentence's tags for every feature,
+    so the same sentence in differently chunked texts, from different users
+    or with different feature selections is tagged once. Unseen sentences
+    are tagged together in batches; the requested features are selected and
+    the words shifted back to offsets in text.
+    """
+    spans = sentence_cores(text)
+
+    keys = [sentence_key(language, version, core) for _, core in spans]
+    found: Dict[str, List[Dict[str, Any]]] = {}
+    missing: Dict[str, str] = {}
+    for key, (_, core) in zip(keys, spans):
+        if key in found or key in missing:
+            continue
+        entry = memo.get(key)
+        if entry is None:
+            missing[key] = core
+        else:
+            found[key] = entry['candidates']
+
+    batch_keys: List[str] = []
+    batch_size = 0
+    pending = list(missing.items())
+    for i, (key, core) in enumerate(pending):
+        batch_keys.append(key)
+        batch_size += len(core) + len(BATCH_SEPARATOR)
+        if batch_size >= BATCH_MAX_CHARS or i == len(pending) - 1:
+            results = tag_batch(tag, [missing[k] for k in batch_keys])
+            for batch_key, candidates in zip(batch_keys, results):
+                found[batch_key] = candidates
+                memo.put(batch_key, {'candidates': candidates})
+            batch_keys = []
+            batch_size = 0
+
+    candidates = []
+    for (core_start, _), key in zip(spans, keys):
+        candidates.extend(shift_candidates(found[key], core_start))
+    return {
+        'text': text,
+        'words': select_words(candidates, features)
+    }
+
+
+def load_annotations(directory: str, memo: AnalysisCache, language: str, version: str) -> int:
+    """Load language's sentence tags written by annotate.py into the memo; returns the entry count.
+
+    Only records made with the given model version are loaded; tags from
+    other versions would never be looked up.
+    """
+    path = os.path.join(directory, f'{language}.annotations.jsonl')
+    if not os.path.exists(path):
+        return 0
+    prefix = sentence_key(language, version, '').rsplit('|', 1)[0] + '|'
+    loaded = stale = corrupt = 0
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                key = record['k']
+            except (ValueError, TypeError, KeyError):
+                # A truncated or hand-edited line costs that sentence, not the file
+                corrupt += 1
+                continue
+            if 'c' not in record or not key.startswith(prefix):
+                stale += 1
+                continue
+            memo.put(key, {'candidates': record['c']})
+            loaded += 1
+    logger.info(f"Loaded {loaded} annotated {language} sentences for {version} from {path}"
+                + (f" (skipped {stale} from other model versions)" if stale else ''))
+    if corrupt:
+        logger.warning(f"Skipped {corrupt} undecodable lines in {path}")
+    if loaded > memo.max_entries:
+        logger.warning(f"Sentence memo holds {memo.max_entries} entries but {loaded} {language} "
+                       f"sentences were annotated; raise SENTENCE_MEMO_SIZE to keep them all")
+    elif memo.stats()['entries'] >= memo.max_entries:
+        logger.warning(f"Sentence memo is full after loading {language} annotations; earlier entries "
+                       f"were evicted, raise SENTENCE_MEMO_SIZE to keep them all")
+    return loaded
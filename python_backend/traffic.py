@@ -0,0 +1,83 @@
+import hashlib
+import json
+import logging
+import logging.handlers
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Request fields that may contain user text; they are hashed, and kept verbatim only when sampled
+TEXT_FIELDS = ('text', 'context_before', 'context_after', 'original', 'answer')
+
+
+def digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class TrafficRecorder:
+    """Append-only JSONL log of service requests for deterministic replay.
+
+    Every request records its start time, endpoint, language, sizes,
+    features, status, duration and a digest of the response body. User text
+    is replaced by its hash. All text of a request is kept verbatim for a
+    ``sample_rate`` fraction of requests, chosen by a hash of their text
+    fields together, so a repeated request is either always or never
+    sampled. Files rotate at ``max_bytes``, keeping ``backup_count`` old ones.
+    """
+
+    def __init__(self, path: str, sample_rate: float = 0.0,
+                 max_bytes: int = 50 * 1024 * 1024, backup_count: int = 5):
+        self.path = path
+        self.sample_rate = sample_rate
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        # A private logger gives thread-safe writes and rotation for free
+        self._log = logging.getLogger(f'{__name__}.{id(self)}')
+        self._log.propagate = False
+        self._log.setLevel(logging.INFO)
+        self._log.addHandler(handler)
+        logger.info(f"Recording traffic to {path} (text sample rate {sample_rate})")
+
+    def _sampled(self, text_hash: str) -> bool:
+        return int(text_hash[:8], 16) / 0xFFFFFFFF < self.sample_rate
+
+    @staticmethod
+    def _text_entry(value: str, sampled: bool) -> Dict[str, Any]:
+        entry = {'length': len(value), 'hash': digest(value.encode('utf-8'))}
+        if sampled:
+            entry['value'] = value
+        return entry
+
+    def record(self, endpoint: str, language: str, payload: Optional[Dict[str, Any]],
+               status: int, started: float, duration: float, body: bytes):
+        """Write one request to the trace; started is its wall-clock start time."""
+        entry: Dict[str, Any] = {
+            # Replay paces and orders by start time, so overlapping requests overlap again
+            'ts': round(started, 4),
+            'endpoint': endpoint,
+            'language': language,
+            'status': status,
+            'duration_ms': round(duration * 1000, 2),
+            'result_digest': digest(body),
+        }
+        payload = payload if isinstance(payload, dict) else {}
+        if 'features' in payload:
+            entry['features'] = payload['features']
+        if 'feature' in payload:
+            entry['feature'] = payload['feature']
+
+        texts = {field: payload[field] for field in TEXT_FIELDS
+                 if isinstance(payload.get(field), str)}
+        if not texts:
+            self._log.info(json.dumps(entry, ensure_ascii=False, separators=(',', ':')))
+            return
+
+        sampled = self._sampled(digest('\x1f'.join(texts.values()).encode('utf-8')))
+        entry['sampled'] = sampled
+        for field, value in texts.items():
+            entry[field] = self._text_entry(value, sampled)
+        if isinstance(payload.get('prefetch'), list):
+            entry['prefetch'] = [self._text_entry(t, sampled) for t in payload['prefetch']
+                                 if isinstance(t, str)]
+        self._log.info(json.dumps(entry, ensure_ascii=False, separators=(',', ':')))